@@ -0,0 +1,166 @@
+# attendance/absences.py
+
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .analytics import AttendanceMatrix, NO_MARK, PRESENT, LATE
+
+# Calendar days looked back over; the chronic-absence rate covers this period
+DEFAULT_LOOKBACK_DAYS = 180
+# Calendar days in the rolling attendance rate
+DEFAULT_ROLLING_DAYS = 30
+
+
+def school_days(matrix):
+    """
+    Columns that count towards streaks and rates: working days on which any
+    attendance was taken. Days before records begin, or today before the
+    register is taken, would otherwise count as an absence for everyone.
+    """
+    return matrix.working & (matrix.codes != NO_MARK).any(axis=0)
+
+
+def enrolled_days(matrix):
+    """
+    Students x days bool matrix, true from the day each student enrolled:
+    their created_date, or their first mark in the matrix when that is
+    earlier (students added after their attendance was imported). Days
+    before it are not absences.
+    """
+    days = np.fromiter((day.toordinal() for day in matrix.dates), dtype=np.int64, count=len(matrix.dates))
+    created = np.fromiter(
+        (timezone.localdate(student.created_date).toordinal() for student in matrix.students),
+        dtype=np.int64, count=len(matrix.students),
+    )
+    marked = np.cumsum(matrix.codes != NO_MARK, axis=1) > 0
+    return (days[np.newaxis, :] >= created[:, np.newaxis]) | marked
+
+
+def absence_runs(absent):
+    """
+    Length of the absence run ending at each working day (0 where attended):
+    a running count of absences, less its value at the latest attended day.
+    """
+    count = np.cumsum(absent, axis=1, dtype=np.int32)
+    reset = np.maximum.accumulate(np.where(absent, 0, count), axis=1)
+    return count - reset
+
+
+def rolling_rates(matrix, days=DEFAULT_ROLLING_DAYS, columns=None):
+    """
+    Students x calendar days float matrix: percentage of the school days in
+    the `days` calendar days ending on each day that were attended. NaN where
+    that window holds no school day. `columns` is the days that count, per
+    day or per student and day (default: school days after enrolment).
+    """
+    if columns is None:
+        columns = school_days(matrix) & enrolled_days(matrix)
+    columns = np.broadcast_to(columns, matrix.codes.shape)
+    attended = (matrix.codes == PRESENT) | (matrix.codes == LATE)
+    attended &= columns
+
+    # Prefix sums with a leading zero column, so a window is a difference of two columns
+    attended_sum = np.zeros((attended.shape[0], attended.shape[1] + 1), dtype=np.int32)
+    np.cumsum(attended, axis=1, out=attended_sum[:, 1:])
+    possible_sum = np.zeros_like(attended_sum)
+    np.cumsum(columns, axis=1, out=possible_sum[:, 1:])
+
+    end = np.arange(1, attended.shape[1] + 1)
+    start = np.maximum(end - days, 0)
+    possible = possible_sum[:, end] - possible_sum[:, start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(
+            possible > 0, (attended_sum[:, end] - attended_sum[:, start]) * 100 / possible, np.nan,
+        )
+
+
+class AbsenceReport:
+    """
+    Absence streaks, rolling attendance rates and chronic-absenteeism flags
+    for every student in an AttendanceMatrix, computed for all students at
+    once. Only school days (see school_days) from a student's enrolment (see
+    enrolled_days) count: a streak runs on across weekends and holidays, and
+    a school day without a present or late mark counts as an absence.
+    """
+
+    def __init__(self, matrix, rolling_days=DEFAULT_ROLLING_DAYS, threshold=None, streak_alert=None):
+        self.matrix = matrix
+        self.rolling_days = rolling_days
+        if threshold is None:
+            threshold = getattr(settings, 'CHRONIC_ABSENCE_THRESHOLD', 90)
+        if streak_alert is None:
+            streak_alert = getattr(settings, 'ABSENCE_STREAK_ALERT_DAYS', 3)
+        self.threshold = threshold
+        self.streak_alert = streak_alert
+
+        columns = school_days(matrix)
+        enrolled = enrolled_days(matrix)
+        self.school_dates = np.array(matrix.dates)[columns]
+        codes = matrix.codes[:, columns]
+        counted = enrolled[:, columns]
+        absent = (codes != PRESENT) & (codes != LATE) & counted
+        runs = absence_runs(absent)
+        n_days = absent.shape[1]
+
+        if n_days:
+            self.current_streak = runs[:, -1]
+            self.longest_streak = runs.max(axis=1)
+            counted_days = counted.sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.attendance_rate = np.where(
+                    counted_days > 0, (counted_days - absent.sum(axis=1)) * 100 / counted_days, np.nan,
+                )
+            # A current streak of k days began k school days before the end
+            start_index = np.clip(n_days - self.current_streak, 0, n_days - 1)
+            self.current_streak_start = np.where(self.current_streak > 0, self.school_dates[start_index], None)
+        else:
+            self.current_streak = self.longest_streak = np.zeros(len(matrix.students), dtype=np.int32)
+            self.attendance_rate = np.full(len(matrix.students), np.nan)
+            self.current_streak_start = np.full(len(matrix.students), None)
+
+        self.rolling_rate = rolling_rates(matrix, rolling_days, columns & enrolled)[:, -1]
+        self.chronic = self.attendance_rate < self.threshold
+        self.on_streak = self.current_streak >= self.streak_alert
+
+    @classmethod
+    def for_date(cls, end_date, lookback_days=DEFAULT_LOOKBACK_DAYS, students=None, **kwargs):
+        matrix = AttendanceMatrix.load(end_date - timedelta(days=lookback_days - 1), end_date, students)
+        return cls(matrix, **kwargs)
+
+    @property
+    def flagged(self):
+        return self.chronic | self.on_streak
+
+    def rows(self, flagged_only=True):
+        """
+        One dict per student, longest current streak first and then lowest
+        rolling rate; only flagged students unless flagged_only is False.
+        """
+        indexes = np.flatnonzero(self.flagged) if flagged_only else np.arange(len(self.matrix.students))
+        rolling = np.nan_to_num(self.rolling_rate[indexes], nan=100.0)
+        indexes = indexes[np.lexsort((rolling, -self.current_streak[indexes]))]
+
+        return [
+            {
+                'student': self.matrix.students[i],
+                'current_streak': int(self.current_streak[i]),
+                'current_streak_start': self.current_streak_start[i],
+                'longest_streak': int(self.longest_streak[i]),
+                'rolling_rate': None if np.isnan(self.rolling_rate[i]) else round(float(self.rolling_rate[i]), 1),
+                'attendance_rate': None if np.isnan(self.attendance_rate[i]) else round(float(self.attendance_rate[i]), 1),
+                'chronic': bool(self.chronic[i]),
+                'on_streak': bool(self.on_streak[i]),
+            }
+            for i in indexes
+        ]
+
+    def counts(self):
+        return {
+            'students': len(self.matrix.students),
+            'flagged': int(self.flagged.sum()),
+            'chronic': int(self.chronic.sum()),
+            'on_streak': int(self.on_streak.sum()),
+        }
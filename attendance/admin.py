@@ -1,7 +1,14 @@
 from django.contrib import admin
-from django.http import HttpResponse
-import csv
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from .models import Teacher, Student, Holiday, Attendance
+from .counters import apply_status_changes, lock_students
+from .rollups import attendance_written
+from .exports import iter_csv
+from .changelists import (
+    AutocompleteFilter, EstimatedCountPaginator, LargeTableChangeList, prefix_range,
+)
 
 
 @admin.register(Teacher)
@@ -28,9 +35,13 @@ class HolidayAdmin(admin.ModelAdmin):
 
 def mark_present(modeladmin, request, queryset):
     """Admin action — mark selected attendance records as present (sets time_in to now)."""
-    from django.utils import timezone
-    now = timezone.now().time()
-    updated = queryset.update(status='present', time_in=now)
+    now = timezone.now()
+    with transaction.atomic():
+        lock_students(queryset.values('student_id'))
+        rows = list(queryset.select_for_update().values_list('student_id', 'date', 'status'))
+        updated = queryset.update(status='present', time_in=now.time(), updated_timestamp=now)
+        apply_status_changes([(student_pk, day, old, 'present') for student_pk, day, old in rows])
+    attendance_written([(student_pk, day) for student_pk, day, _ in rows])
     modeladmin.message_user(request, f"{updated} record(s) marked as Present.")
 
 
@@ -39,7 +50,12 @@ mark_present.short_description = "Mark selected attendance as Present"
 
 def mark_absent(modeladmin, request, queryset):
     """Admin action — mark selected attendance records as absent (clears time_in)."""
-    updated = queryset.update(status='absent', time_in=None)
+    with transaction.atomic():
+        lock_students(queryset.values('student_id'))
+        rows = list(queryset.select_for_update().values_list('student_id', 'date', 'status'))
+        updated = queryset.update(status='absent', time_in=None, updated_timestamp=timezone.now())
+        apply_status_changes([(student_pk, day, old, 'absent') for student_pk, day, old in rows])
+    attendance_written([(student_pk, day) for student_pk, day, _ in rows])
     modeladmin.message_user(request, f"{updated} record(s) marked as Absent.")
 
 
@@ -47,29 +63,9 @@ mark_absent.short_description = "Mark selected attendance as Absent"
 
 
 def export_attendance_csv(modeladmin, request, queryset):
-    """Export selected attendance records as CSV."""
-    meta = modeladmin.model._meta
-    field_names = ['student__student_id', 'student__name', 'date', 'status', 'time_in', 'time_out', 'marked_by__name', 'created_timestamp']
-
-    response = HttpResponse(content_type='text/csv')
+    """Export selected attendance records as CSV (streamed, so large selections stay in constant memory)."""
+    response = StreamingHttpResponse(iter_csv(queryset), content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename=attendance_export.csv'
-    writer = csv.writer(response)
-
-    # Header
-    writer.writerow(['Student ID', 'Student Name', 'Date', 'Status', 'Time In', 'Time Out', 'Marked By', 'Created Timestamp'])
-
-    for obj in queryset.select_related('student', 'marked_by'):
-        writer.writerow([
-            obj.student.student_id,
-            obj.student.name,
-            obj.date.isoformat(),
-            obj.status,
-            obj.time_in.isoformat() if obj.time_in else '',
-            obj.time_out.isoformat() if obj.time_out else '',
-            obj.marked_by.name if obj.marked_by else '',
-            obj.created_timestamp.isoformat() if obj.created_timestamp else '',
-        ])
-
     return response
 
 
@@ -78,11 +74,43 @@ export_attendance_csv.short_description = "Export selected attendance to CSV"
 
 @admin.register(Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
+    """
+    Built for tables with millions of rows: estimated pagination, no full
+    result count, autocomplete student/teacher filters instead of option
+    lists, an index-range search on student_id and a date hierarchy drawn
+    from the date bounds rather than distinct dates.
+    """
     list_display = ['student', 'date', 'status', 'time_in', 'time_out', 'marked_by', 'created_timestamp']
-    list_filter = ['status', 'date', 'marked_by']
-    search_fields = ['student__name', 'student__student_id']
+    list_filter = ['status', 'date', ('student', AutocompleteFilter), ('marked_by', AutocompleteFilter)]
+    search_fields = ['student__student_id']
+    search_help_text = 'Search by student ID prefix (e.g. ST00)'
     date_hierarchy = 'date'
-    readonly_fields = ['created_timestamp']
+    readonly_fields = ['created_timestamp', 'updated_timestamp']
+    autocomplete_fields = ['student', 'marked_by']
     actions = [mark_present, mark_absent, export_attendance_csv]
-    list_select_related = ('student', 'marked_by')
-    ordering = ['-date', 'student__student_id']
+    # Related rows are prefetched for the page instead of joined, so the
+    # planner can walk attendance_date_student_idx even when a filter is set
+    list_select_related = ()
+    # (student, date) is unique, so this ordering is total and the date index serves it
+    ordering = ['-date', 'student']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('student', 'marked_by')
+
+    def get_changelist(self, request, **kwargs):
+        return LargeTableChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        # Student IDs are usually upper case; accept the prefix as typed too
+        matches = prefix_range('student_id', term) | prefix_range('student_id', term.upper())
+        return queryset.filter(student__in=Student.objects.filter(matches).values('pk')), False
+
+    @property
+    def media(self):
+        return super().media + AutocompleteFilter.media(self.model._meta.get_field('student'), self.admin_site)
@@ -0,0 +1,169 @@
+# attendance/analytics.py
+
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, CharField, IntegerField, Value, When
+from django.db.models.functions import Cast
+
+from .models import Student, Attendance
+from .workdays import get_working_day_calendar
+
+# Matrix cell codes; NO_MARK means nothing was recorded for that student and day
+NO_MARK, PRESENT, LATE, ABSENT = 0, 1, 2, 3
+STATUS_CODES = {'present': PRESENT, 'late': LATE, 'absent': ABSENT}
+
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+DEFAULT_PERCENTAGE_BINS = (0, 50, 75, 90, 100)
+MARK_DTYPE = [('student', np.int64), ('day', 'U10'), ('code', np.int8)]
+
+
+def matrix_engine_enabled():
+    return getattr(settings, 'ATTENDANCE_ANALYTICS_ENGINE', 'orm') == 'numpy'
+
+
+def _fetch_marks(attendance):
+    """
+    (student, day, code) for every row of `attendance` as one structured
+    array. The status code and ISO date are computed by the database and the
+    cursor is read directly, skipping per-row model field conversion.
+    """
+    status_code = Case(
+        *[When(status=status, then=Value(code)) for status, code in STATUS_CODES.items()],
+        default=Value(NO_MARK), output_field=IntegerField(),
+    )
+    query = attendance.annotate(
+        day=Cast('date', CharField()), code=status_code,
+    ).values_list('student_id', 'day', 'code').query
+    sql, params = query.get_compiler(using=attendance.db).as_sql()
+    with connections[attendance.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return np.fromiter(rows, dtype=MARK_DTYPE, count=len(rows))
+
+
+class AttendanceMatrix:
+    """
+    Attendance for a date range as a students x days int8 matrix.
+
+    Built from one values_list pass and one vectorized scatter; every
+    statistic is then a reduction over the matrix instead of a query per
+    student or per day. Rows follow `students` (name order by default),
+    columns are the calendar days from start_date to end_date, and
+    `working` masks the columns that are working days.
+    """
+
+    def __init__(self, students, start_date, end_date, codes, working):
+        self.students = students
+        self.start_date = start_date
+        self.end_date = end_date
+        self.codes = codes
+        self.working = working
+
+    @classmethod
+    def load(cls, start_date, end_date, students=None):
+        """
+        Matrix for `students` (default: all active students) over
+        [start_date, end_date]. Marks of students outside the matrix are
+        ignored, so the default case reads the date range without a join.
+        """
+        attendance = Attendance.objects.filter(date__range=[start_date, end_date])
+        if students is None:
+            students = Student.objects.filter(is_active=True)
+        else:
+            attendance = attendance.filter(student__in=students.values('pk'))
+        student_list = list(students.order_by('name', 'pk'))
+        n_days = (end_date - start_date).days + 1
+        codes = np.zeros((len(student_list), n_days), dtype=np.int8)
+
+        rows = _fetch_marks(attendance)
+        if len(rows) and student_list:
+            pks = np.fromiter((student.pk for student in student_list), dtype=np.int64, count=len(student_list))
+            order = np.argsort(pks)
+            sorted_pks = pks[order]
+            position = np.searchsorted(sorted_pks, rows['student']).clip(max=len(pks) - 1)
+            known = sorted_pks[position] == rows['student']
+
+            # Dates arrive as ISO strings, so their column is a search among the range's days
+            days = np.array([(start_date + timedelta(days=i)).isoformat() for i in range(n_days)])
+            column = np.searchsorted(days, rows['day'][known])
+            codes[order[position[known]], column] = rows['code'][known]
+
+        return cls(student_list, start_date, end_date, codes, cls._working_mask(start_date, n_days))
+
+    @staticmethod
+    def _working_mask(start_date, n_days):
+        weekdays = (start_date.weekday() + np.arange(n_days)) % 7
+        working = weekdays < 5
+        end_date = start_date + timedelta(days=n_days - 1)
+        holidays = get_working_day_calendar().holidays_between(start_date, end_date)
+        working[[day.toordinal() - start_date.toordinal() for day in holidays]] = False
+        return working
+
+    # Shape --------------------------------------------------------------
+
+    @property
+    def dates(self):
+        return [self.start_date + timedelta(days=i) for i in range(self.codes.shape[1])]
+
+    @property
+    def weekdays(self):
+        return (self.start_date.weekday() + np.arange(self.codes.shape[1])) % 7
+
+    @property
+    def working_days(self):
+        return int(self.working.sum())
+
+    # Per student --------------------------------------------------------
+
+    def student_counts(self):
+        """(present, late, absent) arrays per student; unmarked working days count as absent."""
+        present = np.count_nonzero(self.codes == PRESENT, axis=1)
+        late = np.count_nonzero(self.codes == LATE, axis=1)
+        absent = np.maximum(self.working_days - present - late, 0)
+        return present, late, absent
+
+    def student_percentages(self):
+        """Share of working days marked present, per student, as in the attendance report."""
+        present, _, _ = self.student_counts()
+        if not self.working_days:
+            return np.zeros(len(self.students))
+        return present / self.working_days * 100
+
+    # Per day ------------------------------------------------------------
+
+    def daily_totals(self):
+        """Dict of status -> array of per-day counts, aligned with self.dates."""
+        return {
+            status: np.count_nonzero(self.codes == code, axis=0)
+            for status, code in STATUS_CODES.items()
+        }
+
+    def weekday_rates(self):
+        """Attendance rate (present or late) per weekday name over the working days."""
+        attended = np.count_nonzero((self.codes == PRESENT) | (self.codes == LATE), axis=0)
+        weekdays = self.weekdays[self.working]
+        attended_by_day = np.bincount(weekdays, weights=attended[self.working], minlength=5)[:5]
+        possible = np.bincount(weekdays, minlength=5)[:5] * len(self.students)
+        rates = np.divide(attended_by_day * 100, possible, out=np.zeros(5), where=possible > 0)
+        return dict(zip(WEEKDAY_NAMES, np.round(rates, 1).tolist()))
+
+    # Class-wide ---------------------------------------------------------
+
+    def percentage_distribution(self, bins=DEFAULT_PERCENTAGE_BINS):
+        """[(low, high, students)] histogram of per-student attendance percentages."""
+        counts, edges = np.histogram(self.student_percentages(), bins=bins)
+        return [(float(edges[i]), float(edges[i + 1]), int(count)) for i, count in enumerate(counts)]
+
+    def summary(self):
+        """Class-wide mean, median and spread of the per-student percentages."""
+        percentages = self.student_percentages()
+        if not len(percentages):
+            return {'mean': 0.0, 'median': 0.0, 'std': 0.0}
+        return {
+            'mean': round(float(percentages.mean()), 1),
+            'median': round(float(np.median(percentages)), 1),
+            'std': round(float(percentages.std()), 1),
+        }
@@ -0,0 +1,51 @@
+# attendance/backends.py
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .models import Teacher
+
+UserModel = get_user_model()
+
+
+class TeacherBackend(ModelBackend):
+    """
+    ModelBackend that loads the user together with their Teacher profile in
+    one query when AuthenticationMiddleware resolves request.user from the
+    session. `hasattr(request.user, 'teacher')` and `request.user.teacher`
+    then cost nothing, including for users without a profile (the missing
+    row is cached too). Authentication itself is ModelBackend's.
+    """
+
+    def get_queryset(self):
+        return UserModel._default_manager.select_related('teacher')
+
+    def get_user(self, user_id):
+        try:
+            user = self.get_queryset().get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        try:
+            user = await self.get_queryset().aget(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+async def aget_teacher(user):
+    """
+    The Teacher profile of `user`, or None, for async views: read from the
+    user when TeacherBackend already loaded it, queried otherwise (sessions
+    authenticated by another backend).
+    """
+    if not user.is_authenticated:
+        return None
+    if UserModel.teacher.is_cached(user):
+        return getattr(user, 'teacher', None)
+    try:
+        return await Teacher.objects.aget(user=user)
+    except Teacher.DoesNotExist:
+        return None
@@ -0,0 +1,56 @@
+# attendance/bulk.py
+
+from django.db import connection, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .models import Attendance
+
+ATTENDANCE_INSERT_FIELDS = ['student', 'date', 'status', 'marked_by', 'time_in', 'created_timestamp', 'updated_timestamp']
+
+
+def insert_attendance_rows(rows, batch_size=10000):
+    """
+    Insert (student pk, date, status, teacher pk, time_in) tuples as fast as the backend allows.
+
+    Used for seeding and synthetic data, where millions of rows are written at
+    once: a single parameterised INSERT is sent with executemany per batch,
+    avoiding bulk_create's per-object overhead and its 999-parameter batches on
+    SQLite. Rows that already exist for (student, date) are skipped. No
+    signals fire, so rebuild rollups and counters afterwards.
+    Returns the number of rows handed to the database.
+    """
+    meta = Attendance._meta
+    fields = [meta.get_field(name) for name in ATTENDANCE_INSERT_FIELDS]
+    ops = connection.ops
+
+    sql = '{insert} {table} ({columns}) VALUES ({params}) {suffix}'.format(
+        insert=ops.insert_statement(on_conflict=OnConflict.IGNORE),
+        table=ops.quote_name(meta.db_table),
+        columns=', '.join(ops.quote_name(field.column) for field in fields),
+        params=', '.join(['%s'] * len(fields)),
+        suffix=ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None) or '',
+    )
+
+    now = ops.adapt_datetimefield_value(timezone.now())
+    written = 0
+    batch = []
+
+    def flush():
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+
+    for student_pk, day, status, teacher_pk, time_in in rows:
+        batch.append((
+            student_pk, ops.adapt_datefield_value(day), status, teacher_pk,
+            ops.adapt_timefield_value(time_in), now, now,
+        ))
+        if len(batch) >= batch_size:
+            flush()
+            written += len(batch)
+            batch = []
+    if batch:
+        flush()
+        written += len(batch)
+
+    return written
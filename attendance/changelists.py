@@ -0,0 +1,191 @@
+# attendance/changelists.py
+
+from datetime import date, timedelta
+
+from django import forms
+from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min, Q, QuerySet
+from django.utils.functional import cached_property
+
+
+def estimate_row_count(model, using='default'):
+    """
+    Cheap approximate row count for a whole table, or None if the backend has
+    no estimate. PostgreSQL reads the planner statistics; SQLite reads the
+    highest rowid, which overshoots only by the number of deleted rows.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}')
+        else:
+            return None
+        row = cursor.fetchone()
+    # reltuples is -1 until the table has been analyzed
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for very large tables. An unfiltered list takes its size from
+    estimate_row_count; a filtered one counts at most `max_count` rows, so
+    pagination never costs a full COUNT(*).
+    """
+    max_count = 100_000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.max_count:
+                return estimate
+        # Ordering only slows the count down
+        return queryset.order_by()[:self.max_count].count()
+
+
+class DateBoundsQuerySet(QuerySet):
+    """
+    dates() built from the first and last value of the field instead of
+    SELECT DISTINCT over every matching row. The admin date hierarchy only
+    needs the drill-down links, and the two bounds come straight from the
+    date index.
+
+    Bounds are read from `bounds_source` when set: the table limited only
+    by the hierarchy's own drill-down, so other filters never turn the
+    lookup into a scan. The cost is that a link may lead to an empty page.
+    """
+    bounds_source = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone.bounds_source = self.bounds_source
+        return clone
+
+    def bounds(self, field_name):
+        """
+        (first, last) as two single-aggregate queries: SQLite answers a lone
+        MIN or MAX from the index but scans for MIN and MAX together.
+        """
+        source = self.bounds_source if self.bounds_source is not None else self
+        first = QuerySet.aggregate(source, value=Min(field_name))['value']
+        last = QuerySet.aggregate(source, value=Max(field_name))['value']
+        return first, last
+
+    def aggregate(self, *args, **kwargs):
+        # The date hierarchy asks for aggregate(first=Min(f), last=Max(f)) on its own
+        if not args and kwargs.keys() == {'first', 'last'}:
+            first, last = kwargs['first'], kwargs['last']
+            if (
+                isinstance(first, Min) and isinstance(last, Max) and not first.filter and not last.filter
+                and first.source_expressions == last.source_expressions
+            ):
+                field_name = first.source_expressions[0].name
+                return dict(zip(('first', 'last'), self.bounds(field_name)))
+        return super().aggregate(*args, **kwargs)
+
+    def dates(self, field_name, kind, order='ASC'):
+        first, last = self.bounds(field_name)
+        if first is None:
+            return []
+
+        if kind == 'year':
+            dates = [date(year, 1, 1) for year in range(first.year, last.year + 1)]
+        elif kind == 'month':
+            months = range(first.year * 12 + first.month - 1, last.year * 12 + last.month)
+            dates = [date(month // 12, month % 12 + 1, 1) for month in months]
+        else:
+            dates = [date.fromordinal(day) for day in range(first.toordinal(), last.toordinal() + 1)]
+        return dates if order == 'ASC' else dates[::-1]
+
+
+class LargeTableChangeList(ChangeList):
+    """ChangeList whose (DateField) date hierarchy reads index bounds rather than distinct dates."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        queryset = super().get_queryset(request, exclude_parameters)
+        bounded = DateBoundsQuerySet(model=queryset.model, query=queryset.query, using=queryset.db)
+        bounded._prefetch_related_lookups = queryset._prefetch_related_lookups
+        if self.date_hierarchy:
+            bounded.bounds_source = self.date_hierarchy_source()
+        return bounded
+
+    def date_hierarchy_source(self):
+        """The whole table narrowed only by the selected year, month and day (already validated)."""
+        field = self.date_hierarchy
+        source = self.root_queryset.order_by()
+        year = self.params.get(f'{field}__year')
+        if year is None:
+            return source
+
+        month = self.params.get(f'{field}__month')
+        day = self.params.get(f'{field}__day')
+        start = date(int(year), int(month or 1), int(day or 1))
+        if day:
+            end = start + timedelta(days=1)
+        elif month:
+            end = (start + timedelta(days=32)).replace(day=1)
+        else:
+            end = start.replace(year=start.year + 1)
+        return source.filter(**{f'{field}__gte': start, f'{field}__lt': end})
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Related-object filter that picks its value through the admin autocomplete
+    view instead of listing every related object up front. The related
+    model's admin must define search_fields.
+    """
+    template = 'admin/attendance/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        self.admin_site = model_admin.admin_site
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    def rendered_widget(self):
+        related = self.field.remote_field.model
+        widget = AutocompleteSelect(
+            self.field, self.admin_site, attrs={'data-filter-param': self.lookup_kwarg}
+        )
+        choice = forms.ModelChoiceField(queryset=related._default_manager.all(), widget=widget, required=False)
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return choice.widget.render(self.lookup_kwarg, value)
+
+    def clear_query_string(self, changelist):
+        return changelist.get_query_string(remove=[self.lookup_kwarg, self.lookup_kwarg_isnull])
+
+    def choices(self, changelist):
+        yield {
+            'selected': not self.lookup_val,
+            'query_string': self.clear_query_string(changelist),
+            'display': 'All',
+        }
+
+    @staticmethod
+    def media(field, admin_site):
+        return AutocompleteSelect(field, admin_site).media + forms.Media(
+            js=['admin/js/jquery.init.js', 'attendance/admin/autocomplete_filter.js']
+        )
+
+
+def prefix_range(field_name, prefix):
+    """
+    Q matching values that start with `prefix` as an index range scan
+    (prefix <= value < next prefix), which any B-tree index can serve, unlike
+    LIKE on SQLite or case-insensitive LIKE on PostgreSQL.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field_name}__gte': prefix, f'{field_name}__lt': upper})
@@ -0,0 +1,154 @@
+# attendance/counters.py
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, Exists, F, IntegerField, Max, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Student, Attendance
+
+COUNTER_FIELDS = {
+    'present': 'present_count',
+    'late': 'late_count',
+    'absent': 'absent_count',
+}
+ATTENDED = ('present', 'late')
+
+
+def lock_students(student_pks):
+    """
+    Lock the students' rows until the end of the transaction. Every write path
+    takes these locks before reading the statuses it replaces, so concurrent
+    writes for the same students queue up instead of both applying a
+    transition from the same stale status. (SQLite ignores row locks; its
+    IMMEDIATE transactions already serialise writers.)
+    """
+    return list(
+        Student.objects.select_for_update().filter(pk__in=student_pks).order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def apply_status_changes(changes):
+    """
+    Adjust Student counters for attendance writes, atomically with F() updates.
+
+    `changes` is an iterable of (student pk, date, old status, new status);
+    old status is None for a new row and new status is None for a deleted one.
+    Changes are summed per student, and students whose counters move by the
+    same amounts are updated with one UPDATE. Call inside the transaction that
+    performs the write.
+    """
+    deltas = defaultdict(Counter)
+    attended_on = defaultdict(set)
+    lost_attendance = set()
+
+    for student_pk, day, old, new in changes:
+        if old == new:
+            continue
+        if old is not None:
+            deltas[student_pk][COUNTER_FIELDS[old]] -= 1
+        if new is not None:
+            deltas[student_pk][COUNTER_FIELDS[new]] += 1
+        if old is None:
+            deltas[student_pk]['total_count'] += 1
+        elif new is None:
+            deltas[student_pk]['total_count'] -= 1
+        if new in ATTENDED:
+            attended_on[day].add(student_pk)
+        elif old in ATTENDED:
+            lost_attendance.add(student_pk)
+
+    by_delta = defaultdict(list)
+    for student_pk, delta in deltas.items():
+        delta = tuple(sorted((field, n) for field, n in delta.items() if n))
+        if delta:
+            by_delta[delta].append(student_pk)
+
+    for delta, student_pks in by_delta.items():
+        Student.objects.filter(pk__in=student_pks).update(**{field: F(field) + n for field, n in delta})
+
+    for day, student_pks in attended_on.items():
+        Student.objects.filter(pk__in=student_pks).update(
+            last_attended_date=Greatest(Coalesce(F('last_attended_date'), Value(day)), Value(day))
+        )
+
+    if lost_attendance:
+        # The latest attended day may have just been un-marked; look it up again
+        Student.objects.filter(pk__in=lost_attendance).update(last_attended_date=_last_attended_subquery())
+
+
+def _count_subquery(status=None):
+    # Filter on status inside the Count rather than the WHERE clause so the planner
+    # walks the (student, date) unique index instead of the status index.
+    count = Count('id', filter=Q(status=status)) if status else Count('id')
+    rows = Attendance.objects.filter(student=OuterRef('pk')).order_by().values('student').annotate(n=count)
+    return Coalesce(Subquery(rows.values('n'), output_field=IntegerField()), 0)
+
+
+def _last_attended_subquery():
+    return Subquery(
+        Attendance.objects.filter(student=OuterRef('pk'), status__in=ATTENDED)
+        .order_by().values('student').annotate(last=Max('date')).values('last')
+    )
+
+
+def recompute_counters(student_pks=None, pk_range=None):
+    """Rebuild counters from raw Attendance rows for some or all students."""
+    students = Student.objects.all()
+    if student_pks is not None:
+        students = students.filter(pk__in=student_pks)
+    if pk_range is not None:
+        students = students.filter(pk__range=pk_range)
+
+    return students.update(
+        present_count=_count_subquery('present'),
+        late_count=_count_subquery('late'),
+        absent_count=_count_subquery('absent'),
+        total_count=_count_subquery(),
+        last_attended_date=_last_attended_subquery(),
+    )
+
+
+def backfill_counters():
+    """
+    Recompute the counters of students that have attendance rows but a zero
+    total: rows written before the counters existed, e.g. on a database
+    upgraded with `migrate`. Cheap once done, so it runs after every migrate.
+    Returns the number of students recomputed.
+    """
+    stale = Student.objects.filter(total_count=0).filter(
+        Exists(Attendance.objects.filter(student=OuterRef('pk')))
+    ).values('pk')
+    return recompute_counters(student_pks=stale)
+
+
+def find_inconsistent_counters(pk_range=None):
+    """Students whose stored counters disagree with the raw Attendance rows."""
+    students = Student.objects.all()
+    if pk_range is not None:
+        students = students.filter(pk__range=pk_range)
+
+    students = students.annotate(
+        actual_present=Count('attendance', filter=Q(attendance__status='present')),
+        actual_late=Count('attendance', filter=Q(attendance__status='late')),
+        actual_absent=Count('attendance', filter=Q(attendance__status='absent')),
+        actual_total=Count('attendance'),
+        actual_last_attended=Max('attendance__date', filter=Q(attendance__status__in=ATTENDED)),
+    )
+    mismatched = (
+        ~Q(present_count=F('actual_present'))
+        | ~Q(late_count=F('actual_late'))
+        | ~Q(absent_count=F('actual_absent'))
+        | ~Q(total_count=F('actual_total'))
+        | Q(last_attended_date__isnull=True, actual_last_attended__isnull=False)
+        | Q(last_attended_date__isnull=False, actual_last_attended__isnull=True)
+        # Compare dates only when both are set; the negated lookup would also match two NULLs
+        | (Q(last_attended_date__isnull=False, actual_last_attended__isnull=False)
+           & ~Q(last_attended_date=F('actual_last_attended')))
+    )
+    return students.filter(mismatched).values(
+        'pk', 'student_id',
+        'present_count', 'actual_present', 'late_count', 'actual_late',
+        'absent_count', 'actual_absent', 'total_count', 'actual_total',
+        'last_attended_date', 'actual_last_attended',
+    )
@@ -0,0 +1,89 @@
+# attendance/exports.py
+
+import csv
+import json
+
+from .models import Attendance
+
+EXPORT_FIELDS = [
+    ('student__student_id', 'Student ID'),
+    ('student__name', 'Student Name'),
+    ('date', 'Date'),
+    ('status', 'Status'),
+    ('time_in', 'Time In'),
+    ('time_out', 'Time Out'),
+    ('marked_by__name', 'Marked By'),
+    ('created_timestamp', 'Created Timestamp'),
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the value back, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else ''
+
+
+def filter_export_queryset(queryset=None, start_date=None, end_date=None, student_ids=None):
+    """Apply the export filters; student_ids are Student.student_id values."""
+    if queryset is None:
+        queryset = Attendance.objects.all()
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    if student_ids:
+        queryset = queryset.filter(student__student_id__in=student_ids)
+    return queryset
+
+
+def export_rows(queryset):
+    """Yield export rows as tuples straight off a chunked database cursor."""
+    return (
+        queryset
+        .order_by('date', 'student__student_id')
+        .values_list(*[field for field, _ in EXPORT_FIELDS])
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def iter_csv(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow([label for _, label in EXPORT_FIELDS])
+    for student_id, name, day, status, time_in, time_out, marked_by, created in export_rows(queryset):
+        yield writer.writerow([
+            student_id,
+            name,
+            day.isoformat(),
+            status,
+            _isoformat(time_in),
+            _isoformat(time_out),
+            marked_by or '',
+            _isoformat(created),
+        ])
+
+
+def iter_ndjson(queryset):
+    for student_id, name, day, status, time_in, time_out, marked_by, created in export_rows(queryset):
+        yield json.dumps({
+            'student_id': student_id,
+            'student_name': name,
+            'date': day.isoformat(),
+            'status': status,
+            'time_in': time_in.isoformat() if time_in else None,
+            'time_out': time_out.isoformat() if time_out else None,
+            'marked_by': marked_by,
+            'created_timestamp': created.isoformat() if created else None,
+        }) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv', 'csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+}
@@ -0,0 +1,290 @@
+# attendance/faces.py
+
+import functools
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image, ImageOps
+
+from .marking import save_register
+from .models import Attendance, FaceEmbedding, Student
+
+logger = logging.getLogger(__name__)
+
+# FACE_INDEX_ROOT holds one directory per index build; this file names the current one
+INDEX_POINTER = 'CURRENT'
+# Builds kept on disk: the current one and the one before, which other processes may still be opening
+KEPT_BUILDS = 2
+
+ALREADY_MARKED = 'already_marked'
+
+# What decoding an uploaded or stored picture raises when it is not a usable image,
+# including one whose pixel count exceeds Image.MAX_IMAGE_PIXELS (a decompression bomb)
+UNREADABLE_IMAGE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+class FaceRecognitionExtractor:
+    """
+    Embeddings from the face_recognition (dlib) package: 128 floats per face
+    found, compared by Euclidean distance against FACE_RECOGNITION_TOLERANCE.
+    """
+    dimensions = 128
+
+    def __init__(self):
+        try:
+            import face_recognition
+        except ImportError:
+            raise ImproperlyConfigured(
+                'FaceRecognitionExtractor requires face_recognition (pip install face_recognition)'
+            )
+        self._face_recognition = face_recognition
+        self.model = settings.FACE_RECOGNITION_MODEL
+        self.name = f'face_recognition-{self.model}'
+
+    def extract(self, image):
+        pixels = np.asarray(image)
+        locations = self._face_recognition.face_locations(pixels, model=self.model)
+        encodings = self._face_recognition.face_encodings(pixels, locations)
+        return np.asarray(encodings, dtype=np.float32).reshape(len(encodings), self.dimensions)
+
+
+class PixelExtractor:
+    """
+    Dependency-free, deterministic stand-in for tests and demos. The whole
+    image is one "face", reduced to 16x8 grey pixels and scaled to unit
+    length, so identical photos match exactly; it does not recognise faces.
+    """
+    name = 'pixels-16x8'
+    dimensions = 128
+
+    def extract(self, image):
+        small = ImageOps.fit(image.convert('L'), (16, 8))
+        vector = np.asarray(small, dtype=np.float32).ravel()
+        vector -= vector.mean()
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        return vector[np.newaxis]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_extractor(path):
+    return import_string(path)()
+
+
+def get_face_extractor():
+    """
+    The extractor named by FACE_EMBEDDING_EXTRACTOR: any class with a `name`,
+    `dimensions` and an extract(image) returning a faces x dimensions array.
+    """
+    return _load_extractor(settings.FACE_EMBEDDING_EXTRACTOR)
+
+
+def load_image(file):
+    """RGB image from an open file, turned upright according to its EXIF orientation."""
+    with Image.open(file) as image:
+        return ImageOps.exif_transpose(image).convert('RGB')
+
+
+def refresh_face_embeddings(students, force=False):
+    """
+    Store the embedding of each student's photo, skipping students whose
+    stored embedding already matches their photo_hash and the extractor.
+    Students without a photo_hash (thumbnails not generated yet) are skipped.
+    Returns the number of embeddings written.
+    """
+    extractor = get_face_extractor()
+    students = [student for student in students if student.photo and student.photo_hash]
+    stored = {
+        pk: (photo_hash, name)
+        for pk, photo_hash, name in FaceEmbedding.objects.filter(
+            student__in=[student.pk for student in students]
+        ).values_list('student_id', 'photo_hash', 'extractor')
+    }
+
+    written = 0
+    for student in students:
+        if not force and stored.get(student.pk) == (student.photo_hash, extractor.name):
+            continue
+        try:
+            with student.photo.open('rb') as photo:
+                faces = extractor.extract(load_image(photo))
+        except UNREADABLE_IMAGE_ERRORS:
+            logger.warning(f"Could not read the photo of student {student.student_id}")
+            continue
+        if len(faces) != 1:
+            logger.info(f"Photo of student {student.student_id} shows {len(faces)} faces; not indexed")
+
+        FaceEmbedding.objects.update_or_create(student=student, defaults={
+            'photo_hash': student.photo_hash,
+            'extractor': extractor.name,
+            'vector': faces[0].astype('<f4').tobytes() if len(faces) == 1 else None,
+        })
+        written += 1
+    return written
+
+
+def build_face_index():
+    """
+    Publish the embeddings of active students whose photo is unchanged as a
+    new index build and point INDEX_POINTER at it. Returns the number of
+    students indexed.
+    """
+    extractor = get_face_extractor()
+    rows = list(
+        FaceEmbedding.objects.filter(
+            student__is_active=True, extractor=extractor.name, vector__isnull=False,
+            photo_hash=F('student__photo_hash'),
+        ).order_by('student_id').values_list('student_id', 'vector')
+    )
+    students = np.fromiter((pk for pk, _ in rows), dtype=np.int64, count=len(rows))
+    embeddings = np.empty((len(rows), extractor.dimensions), dtype=np.float32)
+    for i, (_, vector) in enumerate(rows):
+        embeddings[i] = np.frombuffer(vector, dtype='<f4')
+
+    root = settings.FACE_INDEX_ROOT
+    build = f'{timezone.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}'
+    os.makedirs(os.path.join(root, build))
+    np.save(os.path.join(root, build, 'students.npy'), students)
+    np.save(os.path.join(root, build, 'embeddings.npy'), embeddings)
+
+    # Switch readers over in one rename
+    partial = os.path.join(root, f'{INDEX_POINTER}.{os.getpid()}.tmp')
+    with open(partial, 'w') as pointer:
+        pointer.write(build)
+    os.replace(partial, os.path.join(root, INDEX_POINTER))
+
+    older = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir() and entry.name != build),
+        key=lambda entry: entry.stat().st_mtime_ns,
+    )
+    for entry in older[:len(older) - (KEPT_BUILDS - 1)]:
+        # Processes that still map an old build keep their pages until they reopen
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return len(rows)
+
+
+class FaceIndex:
+    """
+    Every indexed student's embedding as one contiguous float32 matrix,
+    memory-mapped read-only so worker processes share a single copy in the
+    page cache. Rows follow `students` (student pks).
+    """
+
+    def __init__(self, build, students, embeddings):
+        self.build = build
+        self.students = students
+        self.embeddings = embeddings
+        self.squared_norms = np.einsum('ij,ij->i', embeddings, embeddings)
+
+    @classmethod
+    def open(cls, root, build):
+        directory = os.path.join(root, build)
+        return cls(
+            build,
+            np.load(os.path.join(directory, 'students.npy')),
+            np.load(os.path.join(directory, 'embeddings.npy'), mmap_mode='r'),
+        )
+
+    def __len__(self):
+        return len(self.students)
+
+    def match(self, probes, tolerance):
+        """
+        Nearest student for each probe embedding (faces x dimensions), all
+        probes against all students in one matrix product, using
+        |e - p|^2 = |e|^2 - 2 e.p + |p|^2. Returns [(student pk or None, distance)],
+        with None where the nearest student is further than `tolerance`.
+        """
+        probes = np.asarray(probes, dtype=np.float32)
+        if not len(self) or not len(probes):
+            return [(None, None)] * len(probes)
+
+        squared = (
+            self.squared_norms[:, np.newaxis]
+            - 2 * (self.embeddings @ probes.T)
+            + np.einsum('ij,ij->i', probes, probes)[np.newaxis, :]
+        )
+        nearest = squared.argmin(axis=0)
+        distances = np.sqrt(np.maximum(squared[nearest, np.arange(len(probes))], 0))
+        return [
+            (int(self.students[row]) if distance <= tolerance else None, float(distance))
+            for row, distance in zip(nearest, distances)
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_face_index():
+    """
+    This process's view of the current index build, reopened once another
+    process has published a newer one. None until an index has been built.
+    """
+    global _index
+    try:
+        with open(os.path.join(settings.FACE_INDEX_ROOT, INDEX_POINTER)) as pointer:
+            build = pointer.read().strip()
+    except FileNotFoundError:
+        return None
+
+    with _index_lock:
+        if _index is None or _index.build != build:
+            _index = FaceIndex.open(settings.FACE_INDEX_ROOT, build)
+        return _index
+
+
+def check_in_faces(image, teacher, index, attendance_date=None, tolerance=None):
+    """
+    Match every face found in `image` against `index` and mark the matched
+    students present. Students already marked present or late that day are
+    left alone. Returns (faces found, [{'student_id', 'name', 'distance', 'outcome'}]).
+    """
+    attendance_date = attendance_date or timezone.now().date()
+    if tolerance is None:
+        tolerance = settings.FACE_RECOGNITION_TOLERANCE
+
+    probes = get_face_extractor().extract(image)
+    matches = {}
+    for pk, distance in index.match(probes, tolerance):
+        if pk is not None and (pk not in matches or distance < matches[pk]):
+            matches[pk] = distance
+    if not matches:
+        return len(probes), []
+
+    students = {
+        pk: (student_id, name)
+        for pk, student_id, name in Student.objects.filter(
+            pk__in=list(matches), is_active=True,
+        ).values_list('pk', 'student_id', 'name')
+    }
+    marked = set(
+        Attendance.objects.filter(
+            date=attendance_date, student__in=list(students), status__in=['present', 'late'],
+        ).values_list('student_id', flat=True)
+    )
+    outcomes = save_register(
+        {student_id: 'present' for pk, (student_id, _) in students.items() if pk not in marked},
+        attendance_date, teacher,
+    )
+
+    results = [
+        {
+            'student_id': student_id,
+            'name': name,
+            'distance': round(matches[pk], 4),
+            'outcome': ALREADY_MARKED if pk in marked else outcomes[student_id],
+        }
+        for pk, (student_id, name) in students.items()
+    ]
+    return len(probes), results
@@ -1,5 +1,6 @@
 from django import forms
 from .models import Student, Holiday
+from .workdays import get_working_day_calendar
 
 class StudentForm(forms.ModelForm):
     class Meta:
@@ -68,4 +69,10 @@ class HolidayForm(forms.ModelForm):
             from django.utils import timezone
             if date < timezone.now().date():
                 raise forms.ValidationError('Holiday date cannot be in the past')
+
+            calendar = get_working_day_calendar()
+            if calendar.is_holiday(date):
+                raise forms.ValidationError(
+                    f'{date:%b %d, %Y} is already a holiday ({calendar.descriptions[date]})'
+                )
         return date
@@ -0,0 +1,163 @@
+# attendance/importers.py
+
+import csv
+import io
+import os
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+
+from .forms import StudentForm
+from .models import Student
+from .rollups import refresh_today_headcount
+from .stats import invalidate_dashboard_stats
+from .thumbnails import queue_thumbnails
+
+ROSTER_FIELDS = ['student_id', 'name', 'email', 'phone', 'address']
+UPDATE_FIELDS = ['name', 'email', 'phone', 'address', 'is_active']
+
+
+class StudentImportForm(StudentForm):
+    """
+    StudentForm's field rules for one roster row.
+    Uniqueness of student_id is handled by the upsert, so the per-row
+    database check is skipped.
+    """
+
+    def validate_unique(self):
+        pass
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.errors = []  # (row number, student_id, message)
+
+    def add_error(self, row_number, student_id, message):
+        self.errors.append((row_number, student_id, message))
+
+
+def read_csv_rows(fileobj):
+    """Yield roster rows as dicts from a text or binary CSV file."""
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(fileobj):
+        yield {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+
+
+def read_xlsx_rows(path):
+    """Yield roster rows as dicts from an XLSX workbook (first sheet, header row first)."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError('Reading .xlsx rosters requires openpyxl (pip install openpyxl)')
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell or '').strip().lower() for cell in next(rows, [])]
+        for values in rows:
+            yield {key: str(value).strip() if value is not None else '' for key, value in zip(header, values)}
+    finally:
+        workbook.close()
+
+
+def _photo_upload(photos, name):
+    """Wrap a photo from the zip archive as an upload so StudentForm.clean_photo can check it."""
+    try:
+        data = photos.read(name)
+    except KeyError:
+        return None
+    content_type = 'image/' + (os.path.splitext(name)[1].lstrip('.').lower().replace('jpg', 'jpeg') or 'unknown')
+    return SimpleUploadedFile(os.path.basename(name), data, content_type=content_type)
+
+
+def _save_batch(batch, result):
+    """Upsert one batch of validated rows keyed on student_id."""
+    existing = set(
+        Student.objects.filter(student_id__in=list(batch)).values_list('student_id', flat=True)
+    )
+
+    with_photo, without_photo = [], []
+    for student_id, (cleaned, photo) in batch.items():
+        student = Student(is_active=True, **{field: cleaned[field] for field in ROSTER_FIELDS})
+        if photo is not None:
+            photo.seek(0)
+            student.photo.save(photo.name, ContentFile(photo.read()), save=False)
+            with_photo.append(student)
+        else:
+            without_photo.append(student)
+
+    # Rows without a photo keep whatever photo (and thumbnails) the student already has
+    photo_fields = UPDATE_FIELDS + ['photo', 'photo_hash']
+    with transaction.atomic():
+        for students, update_fields in ((with_photo, photo_fields), (without_photo, UPDATE_FIELDS)):
+            if students:
+                Student.objects.bulk_create(
+                    students,
+                    update_conflicts=True,
+                    unique_fields=['student_id'],
+                    update_fields=update_fields,
+                )
+        if with_photo:
+            photo_ids = [student.student_id for student in with_photo]
+            transaction.on_commit(lambda: queue_thumbnails(
+                Student.objects.filter(student_id__in=photo_ids).values_list('pk', flat=True)
+            ))
+
+    result.updated += len(existing)
+    result.created += len(batch) - len(existing)
+
+
+def import_roster(rows, photo_archive=None, batch_size=1000):
+    """
+    Validate roster rows with StudentForm's rules and upsert them on student_id.
+    `rows` is any iterable of dicts (see read_csv_rows / read_xlsx_rows);
+    `photo_archive` is an optional zip whose members are named in a `photo` column.
+    Invalid rows are skipped and reported; valid rows are saved in batches.
+    """
+    result = ImportResult()
+    photos = zipfile.ZipFile(photo_archive) if photo_archive else None
+
+    try:
+        batch = {}
+        for row_number, row in enumerate(rows, start=2):  # row 1 is the header
+            student_id = row.get('student_id', '')
+            files = {}
+            photo_name = row.get('photo', '')
+            if photo_name:
+                if photos is None:
+                    result.add_error(row_number, student_id, f'photo {photo_name} given but no photo archive')
+                    continue
+                upload = _photo_upload(photos, photo_name)
+                if upload is None:
+                    result.add_error(row_number, student_id, f'photo {photo_name} not found in archive')
+                    continue
+                files['photo'] = upload
+
+            form = StudentImportForm(data={field: row.get(field, '') for field in ROSTER_FIELDS}, files=files)
+            if not form.is_valid():
+                message = '; '.join(
+                    f'{field}: {" ".join(errors)}' for field, errors in form.errors.items()
+                )
+                result.add_error(row_number, student_id, message)
+                continue
+
+            # A later row for the same student replaces an earlier one
+            batch[form.cleaned_data['student_id']] = (form.cleaned_data, files.get('photo'))
+            if len(batch) >= batch_size:
+                _save_batch(batch, result)
+                batch = {}
+
+        if batch:
+            _save_batch(batch, result)
+    finally:
+        if photos is not None:
+            photos.close()
+
+    refresh_today_headcount()
+    invalidate_dashboard_stats()
+    return result
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from attendance.faces import build_face_index, refresh_face_embeddings
+from attendance.models import Student
+from attendance.thumbnails import generate_thumbnails
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = 'Compute face embeddings for changed student photos and publish the check-in face index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Recompute every embedding, changed or not')
+
+    def handle(self, *args, **options):
+        students = (
+            Student.objects.filter(is_active=True).exclude(photo='').exclude(photo__isnull=True)
+            .only('pk', 'student_id', 'photo', 'photo_hash')
+        )
+
+        written = 0
+        batch = []
+        for student in students.iterator(chunk_size=BATCH_SIZE):
+            if not student.photo_hash:
+                # Embeddings are keyed by the photo hash the thumbnail pipeline records
+                generate_thumbnails(student)
+            batch.append(student)
+            if len(batch) == BATCH_SIZE:
+                written += refresh_face_embeddings(batch, force=options['force'])
+                batch = []
+        written += refresh_face_embeddings(batch, force=options['force'])
+
+        indexed = build_face_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Computed {written} embedding(s); face index holds {indexed} student(s)'
+        ))
@@ -0,0 +1,60 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from attendance.absences import AbsenceReport, DEFAULT_LOOKBACK_DAYS, DEFAULT_ROLLING_DAYS
+
+CSV_FIELDS = [
+    'student_id', 'name', 'current_streak', 'current_streak_start', 'longest_streak',
+    'rolling_rate', 'attendance_rate', 'chronic', 'on_streak',
+]
+
+
+class Command(BaseCommand):
+    help = 'List students on an absence streak or below the chronic-absence threshold (e.g. nightly)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=parse_date, help='Last day considered (YYYY-MM-DD); defaults to today')
+        parser.add_argument('--lookback', type=int, default=DEFAULT_LOOKBACK_DAYS,
+                            help='Calendar days the attendance rate and streaks are computed over')
+        parser.add_argument('--rolling', type=int, default=DEFAULT_ROLLING_DAYS,
+                            help='Calendar days in the rolling attendance rate')
+        parser.add_argument('--threshold', type=float, help='Chronic below this attendance percentage')
+        parser.add_argument('--streak', type=int, help='Flag this many consecutive absent working days')
+        parser.add_argument('--all', action='store_true', help='List every student, not only flagged ones')
+        parser.add_argument('--csv', help='Write the rows to this CSV file instead of the console')
+
+    def handle(self, *args, **options):
+        as_of = options['date'] or timezone.now().date()
+        started = time.perf_counter()
+        report = AbsenceReport.for_date(
+            as_of, lookback_days=options['lookback'], rolling_days=options['rolling'],
+            threshold=options['threshold'], streak_alert=options['streak'],
+        )
+        rows = report.rows(flagged_only=not options['all'])
+        elapsed = time.perf_counter() - started
+
+        if options['csv']:
+            with open(options['csv'], 'w', newline='') as output:
+                writer = csv.writer(output)
+                writer.writerow(CSV_FIELDS)
+                for row in rows:
+                    writer.writerow([row['student'].student_id, row['student'].name] + [row[f] for f in CSV_FIELDS[2:]])
+        else:
+            for row in rows:
+                flags = ', '.join(label for label, on in (('streak', row['on_streak']), ('chronic', row['chronic'])) if on)
+                self.stdout.write(
+                    f"{row['student'].student_id}: absent {row['current_streak']} day(s) running "
+                    f"(longest {row['longest_streak']}), {row['rolling_rate']}% over {report.rolling_days} days, "
+                    f"{row['attendance_rate']}% overall{f' [{flags}]' if flags else ''}"
+                )
+
+        counts = report.counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['flagged']} of {counts['students']} student(s) flagged as of {as_of} "
+            f"({counts['on_streak']} on a {report.streak_alert}+ day streak, "
+            f"{counts['chronic']} under {report.threshold:g}%) in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,25 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from attendance.writebehind import AttendanceWriteBuffer
+
+
+class Command(BaseCommand):
+    help = 'Replay attendance marks left in the write-behind journal (e.g. after a worker crash)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--journal', default=settings.ATTENDANCE_WRITE_BEHIND_JOURNAL,
+                            help='Journal directory (defaults to ATTENDANCE_WRITE_BEHIND_JOURNAL)')
+        parser.add_argument('--force', action='store_true',
+                            help='Also replay journals whose worker still looks alive; only with every worker stopped')
+
+    def handle(self, *args, **options):
+        journal = options['journal']
+        if not os.path.isdir(journal):
+            self.stdout.write(f'No journal found at {journal}')
+            return
+
+        replayed = AttendanceWriteBuffer(journal).recover(force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f'Replayed {replayed} mark(s) from the journal at {journal}'))
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from attendance.bulk import insert_attendance_rows
+from attendance.counters import recompute_counters
+from attendance.models import Teacher, Student, Holiday
+from attendance.rollups import rebuild_rollups
+from attendance.workdays import get_working_day_calendar, invalidate_working_day_calendar
+
+STATUSES = ['present', 'late', 'absent']
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic school-scale students, holidays and attendance with bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--years', type=float, default=1, help='Years of school days ending today')
+        parser.add_argument('--holidays-per-year', type=int, default=15)
+        parser.add_argument('--attendance-rate', type=float, default=0.9, help='Mean share of days attended')
+        parser.add_argument('--late-rate', type=float, default=0.08, help='Share of attended days marked late')
+        parser.add_argument('--prefix', default='SYN', help='student_id prefix for generated students')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        batch_size = options['batch_size']
+
+        teacher = self.get_teacher()
+        students = self.create_students(options['students'], options['prefix'], batch_size)
+        end = date.today()
+        start = end - timedelta(days=int(options['years'] * 365))
+        self.create_holidays(rng, start, end, options['holidays_per_year'], teacher)
+        # bulk_create skips the Holiday signals, so reload the calendar by hand
+        invalidate_working_day_calendar()
+        calendar = get_working_day_calendar()
+        holidays = calendar.holidays_between(start, end)
+        school_days = calendar.working_days(start, end)
+
+        # Each student has their own attendance habit, so percentages spread out realistically
+        propensity = np.clip(rng.normal(options['attendance_rate'], 0.07, len(students)), 0.3, 1.0)
+        late_share = options['late_rate']
+
+        def attendance_rows():
+            for day in school_days:
+                roll = rng.random(len(students))
+                codes = np.where(roll < propensity * (1 - late_share), 0, np.where(roll < propensity, 1, 2))
+                for student_pk, code in zip(students, codes.tolist()):
+                    yield student_pk, day, STATUSES[code], teacher.pk, None
+
+        created = insert_attendance_rows(attendance_rows(), batch_size=batch_size)
+
+        self.stdout.write('Rebuilding rollups and counters...')
+        rebuild_rollups()
+        recompute_counters()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(students)} students, {len(holidays)} holidays, {len(school_days)} school days, '
+            f'{created} attendance rows'
+        ))
+
+    def get_teacher(self):
+        user, _ = User.objects.get_or_create(username='synthetic-teacher')
+        teacher, _ = Teacher.objects.get_or_create(
+            user=user, defaults={'name': 'Synthetic Teacher', 'subject': 'Benchmarks', 'phone': '0'}
+        )
+        return teacher
+
+    def create_students(self, count, prefix, batch_size):
+        Student.objects.bulk_create(
+            (
+                Student(
+                    student_id=f'{prefix}{i:07d}',
+                    name=f'Student {i:07d}',
+                    email=f'{prefix.lower()}{i}@example.com',
+                    phone='0000000000',
+                    address='Synthetic Street',
+                )
+                for i in range(count)
+            ),
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+        return list(
+            Student.objects.filter(student_id__startswith=prefix).order_by('pk').values_list('pk', flat=True)
+        )
+
+    def create_holidays(self, rng, start, end, per_year, teacher):
+        weekdays = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        weekdays = [day for day in weekdays if day.weekday() < 5]
+        count = min(int(per_year * len(weekdays) / 261), len(weekdays))
+        picked = rng.choice(len(weekdays), size=count, replace=False) if count else []
+        Holiday.objects.bulk_create(
+            [Holiday(date=weekdays[i], description='Synthetic holiday', created_by=teacher) for i in picked],
+            ignore_conflicts=True,
+        )
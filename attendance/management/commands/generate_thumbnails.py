@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from attendance.models import Student
+from attendance.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generate (or with --force, regenerate) cached thumbnails for existing student photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Photos processed in parallel')
+        parser.add_argument('--force', action='store_true', help='Re-render thumbnails that already exist')
+        parser.add_argument('--missing-only', action='store_true', help='Only students without a recorded photo hash')
+
+    def handle(self, *args, **options):
+        students = Student.objects.exclude(photo='').exclude(photo__isnull=True).only('pk', 'photo', 'photo_hash')
+        if options['missing_only']:
+            students = students.filter(photo_hash='')
+
+        def run(student):
+            try:
+                generate_thumbnails(student, force=options['force'])
+                return None
+            except Exception as exc:
+                return f'{student.pk}: {exc}'
+            finally:
+                connection.close()
+
+        # Decoding and resizing release the GIL in Pillow, so threads scale across cores
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(run, students.iterator(chunk_size=500)))
+
+        failures = [failure for failure in results if failure]
+        for failure in failures:
+            self.stderr.write(f'Student {failure}')
+        total = len(results)
+        self.stdout.write(self.style.SUCCESS(
+            f'Thumbnails ready for {total - len(failures)} of {total} student photo(s)'
+        ))
@@ -0,0 +1,38 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from attendance.importers import import_roster, read_csv_rows, read_xlsx_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import or update students from a CSV/XLSX roster (upserts on student_id)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster', help='Path to a .csv or .xlsx file with a header row')
+        parser.add_argument('--photos', help='Zip archive holding the files named in the "photo" column')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Students saved per transaction')
+
+    def handle(self, *args, **options):
+        path = options['roster']
+        if not os.path.exists(path):
+            raise CommandError(f'Roster file not found: {path}')
+
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            if extension == '.xlsx':
+                result = import_roster(read_xlsx_rows(path), options['photos'], options['batch_size'])
+            elif extension == '.csv':
+                with open(path, newline='', encoding='utf-8-sig') as roster:
+                    result = import_roster(read_csv_rows(roster), options['photos'], options['batch_size'])
+            else:
+                raise CommandError('Roster must be a .csv or .xlsx file')
+        except ImportError as exc:
+            raise CommandError(str(exc))
+
+        for row_number, student_id, message in result.errors:
+            self.stderr.write(f'Row {row_number} ({student_id or "no id"}): {message}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.created} created, {result.updated} updated, {len(result.errors)} row(s) rejected'
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from attendance.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the daily and per-student monthly attendance rollups from raw Attendance rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        days, months = rebuild_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {days} daily summaries and {months} student-month rollups'
+        ))
@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max, Min
+
+from attendance.counters import recompute_counters, find_inconsistent_counters
+from attendance.models import Student
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or with --check, verify) the attendance counters stored on Student'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Chunks processed in parallel')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Students per chunk (by primary key range)')
+        parser.add_argument('--check', action='store_true', help='Only report students whose counters are wrong')
+
+    def handle(self, *args, **options):
+        bounds = Student.objects.aggregate(low=Min('pk'), high=Max('pk'))
+        if bounds['low'] is None:
+            self.stdout.write('No students found')
+            return
+
+        chunk_size = options['chunk_size']
+        chunks = [
+            (low, min(low + chunk_size - 1, bounds['high']))
+            for low in range(bounds['low'], bounds['high'] + 1, chunk_size)
+        ]
+
+        def run(pk_range):
+            try:
+                if options['check']:
+                    return list(find_inconsistent_counters(pk_range))
+                return recompute_counters(pk_range=pk_range)
+            finally:
+                connection.close()
+
+        # SQLite allows only one writer at a time, so parallel chunks gain nothing there
+        workers = 1 if connection.vendor == 'sqlite' and not options['check'] else options['workers']
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(run, chunks))
+
+        if options['check']:
+            mismatched = [row for chunk in results for row in chunk]
+            for row in mismatched:
+                self.stderr.write(
+                    f"{row['student_id']}: present {row['present_count']}/{row['actual_present']}, "
+                    f"late {row['late_count']}/{row['actual_late']}, "
+                    f"absent {row['absent_count']}/{row['actual_absent']}, "
+                    f"total {row['total_count']}/{row['actual_total']}, "
+                    f"last attended {row['last_attended_date']}/{row['actual_last_attended']} (stored/actual)"
+                )
+            if mismatched:
+                self.stderr.write(self.style.ERROR(f'{len(mismatched)} student(s) have inconsistent counters'))
+            else:
+                self.stdout.write(self.style.SUCCESS('All attendance counters are consistent'))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f'Recomputed counters for {sum(results)} student(s) in {len(chunks)} chunk(s)'
+            ))
@@ -0,0 +1,87 @@
+# attendance/marking.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Student, Attendance
+from .counters import apply_status_changes, lock_students
+from .rollups import attendance_written
+
+VALID_STATUSES = {code for code, _ in Attendance.STATUS_CHOICES}
+
+# Per-row outcomes returned by save_register
+CREATED = 'created'
+UPDATED = 'updated'
+NOT_FOUND = 'not_found'
+INVALID_STATUS = 'invalid_status'
+
+
+def save_register(submitted, attendance_date, teacher, marked_times=None):
+    """
+    Save a whole register in one transaction.
+
+    `submitted` maps Student.student_id -> status. Students are resolved with a
+    single lookup and rows are written with one bulk upsert on the
+    (student, date) unique key. `marked_times` optionally maps student_id to
+    the local time the mark was taken (defaults to now). Returns a dict of
+    student_id -> outcome.
+    """
+    outcomes = {}
+    wanted = {}
+    for student_id, status in submitted.items():
+        if not isinstance(status, str) or status not in VALID_STATUSES:
+            outcomes[student_id] = INVALID_STATUS
+        else:
+            wanted[student_id] = status
+
+    students = {
+        s.student_id: s
+        for s in Student.objects.filter(student_id__in=list(wanted), is_active=True).only('pk', 'student_id')
+    }
+    for student_id in wanted:
+        if student_id not in students:
+            outcomes[student_id] = NOT_FOUND
+
+    if not students:
+        return outcomes
+
+    local_time = timezone.localtime(timezone.now()).time()
+    marked_times = marked_times or {}
+    rows = []
+    for student_id, student in students.items():
+        status = wanted[student_id]
+        rows.append(Attendance(
+            student=student,
+            date=attendance_date,
+            status=status,
+            marked_by=teacher,
+            time_in=marked_times.get(student_id, local_time) if status == 'present' else None,
+        ))
+
+    with transaction.atomic():
+        # Lock before reading the statuses being replaced, so a concurrent save of
+        # the same register waits and then sees this one's statuses
+        lock_students([student.pk for student in students.values()])
+        existing = dict(
+            Attendance.objects.select_for_update().filter(
+                date=attendance_date, student__in=students.values()
+            ).values_list('student_id', 'status')
+        )
+        Attendance.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'date'],
+            update_fields=['status', 'marked_by', 'time_in', 'updated_timestamp'],
+        )
+        apply_status_changes([
+            (student.pk, attendance_date, existing.get(student.pk), wanted[student_id])
+            for student_id, student in students.items()
+        ])
+        changes = [(student.pk, attendance_date) for student in students.values()]
+        transaction.on_commit(lambda: attendance_written(changes))
+
+    for student_id, student in students.items():
+        outcomes[student_id] = UPDATED if student.pk in existing else CREATED
+
+    return outcomes
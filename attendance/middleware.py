@@ -0,0 +1,134 @@
+# attendance/middleware.py
+
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+# Budget warnings go through the views' logger so they sit next to the view logs
+logger = logging.getLogger('attendance.views')
+
+
+class ViewMetrics:
+    """Process-wide per-view totals, exported in Prometheus text format."""
+
+    FIELDS = [
+        ('requests', 'attendance_view_requests_total', 'Requests handled'),
+        ('queries', 'attendance_view_queries_total', 'SQL queries executed'),
+        ('duplicate_queries', 'attendance_view_duplicate_queries_total', 'SQL queries repeating an earlier query in the same request'),
+        ('sql_seconds', 'attendance_view_sql_seconds_total', 'Time spent in SQL'),
+        ('duration_seconds', 'attendance_view_duration_seconds_total', 'Total time spent handling requests'),
+        ('over_budget', 'attendance_view_over_budget_total', 'Requests exceeding the query or latency budget'),
+    ]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = defaultdict(Counter)
+
+    def record(self, view, **values):
+        with self._lock:
+            self._views[view].update(values)
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def render(self):
+        with self._lock:
+            views = {view: dict(values) for view, values in self._views.items()}
+
+        lines = []
+        for field, metric, description in self.FIELDS:
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} counter')
+            for view in sorted(views):
+                value = views[view].get(field, 0)
+                lines.append(f'{metric}{{view="{view}"}} {self.format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def format_value(value):
+        """Counts print exactly; float sums use repr so no precision is lost (`:g` keeps 6 digits)."""
+        return str(value) if isinstance(value, int) else repr(float(value))
+
+
+view_metrics = ViewMetrics()
+
+
+class QueryStats:
+    """connection.execute_wrapper hook counting and timing every query in a request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.statements[(sql, str(params))] += 1
+
+    @property
+    def duplicates(self):
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Opt-in per-view instrumentation (enable with ATTENDANCE_INSTRUMENTATION).
+
+    Records SQL query count, SQL time, duplicate queries and total time for
+    every request, adds them as a Server-Timing header, feeds the
+    Prometheus endpoint at /metrics/ and logs a warning when a view goes
+    over ATTENDANCE_QUERY_BUDGET queries or ATTENDANCE_LATENCY_BUDGET_MS.
+    Streaming responses are measured up to the point the view returns.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_budget = getattr(settings, 'ATTENDANCE_QUERY_BUDGET', 50)
+        self.latency_budget = getattr(settings, 'ATTENDANCE_LATENCY_BUDGET_MS', 500) / 1000
+
+    def __call__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        with connection.execute_wrapper(stats):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        app_seconds = max(elapsed - stats.seconds, 0)
+
+        response['Server-Timing'] = ', '.join([
+            f'sql;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"',
+            f'dup;desc="{stats.duplicates} duplicate queries"',
+            f'app;dur={app_seconds * 1000:.1f};desc="views and templates"',
+            f'total;dur={elapsed * 1000:.1f}',
+        ])
+
+        over_budget = stats.count > self.query_budget or elapsed > self.latency_budget
+        if over_budget:
+            logger.warning(
+                f"View {view} over budget: {stats.count} queries "
+                f"({stats.duplicates} duplicate, {stats.seconds * 1000:.0f} ms SQL) "
+                f"in {elapsed * 1000:.0f} ms for {request.method} {request.path}"
+            )
+
+        view_metrics.record(
+            view,
+            requests=1,
+            queries=stats.count,
+            duplicate_queries=stats.duplicates,
+            sql_seconds=stats.seconds,
+            duration_seconds=elapsed,
+            over_budget=int(over_budget),
+        )
+        return response
@@ -19,12 +19,40 @@ class Student(models.Model):
     phone = models.CharField(max_length=15)
     address = models.TextField()
     photo = models.ImageField(upload_to='student_photos/', null=True, blank=True)
+    # SHA-256 of the photo, set once its thumbnails exist (see attendance/thumbnails.py)
+    photo_hash = models.CharField(max_length=64, blank=True, db_index=True)
     created_date = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
 
+    # Denormalized attendance counters, kept in step by every Attendance write path
+    # (see attendance/counters.py); rebuild with `manage.py recompute_attendance_counters`.
+    present_count = models.PositiveIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+    absent_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    last_attended_date = models.DateField(null=True, blank=True)
+
+    COUNTER_FIELDS = ('present_count', 'late_count', 'absent_count', 'total_count', 'last_attended_date')
+
+    class Meta:
+        indexes = [
+            # Student lists only ever show active students, ordered by name
+            models.Index(fields=['name'], condition=models.Q(is_active=True), name='student_active_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.student_id} - {self.name}"
 
+    def save(self, **kwargs):
+        # Counters only change through the F() updates in attendance/counters.py; writing
+        # back the values loaded with this instance would undo concurrent increments.
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(**kwargs)
+
 
 class Holiday(models.Model):
     date = models.DateField()
@@ -53,9 +81,72 @@ class Attendance(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='absent')
     marked_by = models.ForeignKey(Teacher, on_delete=models.CASCADE)
     created_timestamp = models.DateTimeField(default=timezone.now)
+    updated_timestamp = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ['student', 'date']
+        indexes = [
+            # Per-day lookups: dashboard, register prefill, daily rollups
+            models.Index(fields=['date', 'status'], name='attendance_date_status_idx'),
+            # Range reports filtered by status
+            models.Index(fields=['status', 'date', 'student'], name='attendance_status_date_idx'),
+            # Admin changelist order: newest day first, then student
+            models.Index(fields=['-date', 'student'], name='attendance_date_student_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student.name} - {self.date} - {self.status}"
+
+
+
+class DailyAttendanceSummary(models.Model):
+    """Per-date attendance totals, kept current by the attendance write paths."""
+    date = models.DateField(unique=True)
+    present = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    total_active = models.PositiveIntegerField(default=0)
+    updated_timestamp = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.date} - {self.present}/{self.total_active} present"
+
+
+class StudentMonthlyAttendance(models.Model):
+    """Per-student attendance totals for one calendar month (month = first day)."""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='monthly_attendance')
+    month = models.DateField()
+    present = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ['student', 'month']
+        ordering = ['-month']
+        indexes = [
+            # Reports sum a range of whole months for every student
+            models.Index(fields=['month', 'student'], name='monthly_month_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student.name} - {self.month:%Y-%m}"
+
+
+
+class FaceEmbedding(models.Model):
+    """
+    Face embedding of a student's photo, as float32 bytes. Recomputed only when
+    the photo (photo_hash) or the extractor changes; `vector` is null when no
+    face was found. See attendance/faces.py.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, related_name='face_embedding')
+    photo_hash = models.CharField(max_length=64)
+    extractor = models.CharField(max_length=100)
+    vector = models.BinaryField(null=True)
+    updated_timestamp = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.student.name} - {self.extractor}"
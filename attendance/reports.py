@@ -0,0 +1,130 @@
+# attendance/reports.py
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db.models import Count, Q, Sum
+
+from .analytics import AttendanceMatrix, matrix_engine_enabled
+from .models import Attendance, Student, StudentMonthlyAttendance
+from .rollups import month_end, month_start
+from .workdays import get_working_day_calendar
+
+
+def count_working_days(start_date, end_date):
+    """Number of working days in [start_date, end_date] (inclusive)."""
+    return get_working_day_calendar().working_days_between(start_date, end_date)
+
+
+def attended_counts_query(start_date, end_date, students=None):
+    """
+    Per-student present/late counts from the marks in [start_date, end_date].
+    The range and statuses are in the WHERE clause, so this is answered from
+    attendance_status_date_idx instead of reading every student's whole
+    history.
+    """
+    marks = Attendance.objects.filter(
+        date__range=[start_date, end_date], status__in=['present', 'late'],
+    )
+    if students is not None:
+        marks = marks.filter(student__in=students)
+    return marks.values('student_id').annotate(
+        present=Count('id', filter=Q(status='present')),
+        late=Count('id', filter=Q(status='late')),
+    ).order_by()
+
+
+def monthly_counts_query(first_month, last_month, students=None):
+    """Per-student present/late counts summed from the StudentMonthlyAttendance rollups of whole months."""
+    months = StudentMonthlyAttendance.objects.filter(month__range=[first_month, last_month])
+    if students is not None:
+        months = months.filter(student__in=students)
+    return months.values('student_id').annotate(present=Sum('present'), late=Sum('late')).order_by()
+
+
+def report_count_queries(start_date, end_date, students=None):
+    """
+    The queries build_attendance_report sums its counts from: the rollups
+    for the whole calendar months in the range, plus the raw marks of the
+    partial months at either end.
+    """
+    first_full = start_date if start_date.day == 1 else month_end(start_date) + timedelta(days=1)
+    last_full = end_date if end_date == month_end(end_date) else month_start(end_date) - timedelta(days=1)
+    if first_full > last_full:
+        return [attended_counts_query(start_date, end_date, students)]
+
+    queries = [monthly_counts_query(first_full, month_start(last_full), students)]
+    if start_date < first_full:
+        queries.append(attended_counts_query(start_date, first_full - timedelta(days=1), students))
+    if last_full < end_date:
+        queries.append(attended_counts_query(last_full + timedelta(days=1), end_date, students))
+    return queries
+
+
+def build_attendance_report(start_date, end_date, students=None):
+    """
+    Present/late/absent counts for every active student over a date range.
+    Counts come from report_count_queries, merged into the student list, or
+    from an AttendanceMatrix when ATTENDANCE_ANALYTICS_ENGINE is 'numpy';
+    days without a present or late mark are reported as absent.
+    """
+    if matrix_engine_enabled():
+        return report_from_matrix(AttendanceMatrix.load(start_date, end_date, students))
+
+    total_working_days = count_working_days(start_date, end_date)
+
+    present, late = Counter(), Counter()
+    # Without a student filter the queries stay on the date indexes; rows of
+    # inactive students are simply not merged
+    for query in report_count_queries(start_date, end_date, students):
+        for row in query:
+            present[row['student_id']] += row['present']
+            late[row['student_id']] += row['late']
+
+    if students is None:
+        students = Student.objects.filter(is_active=True)
+
+    students = list(students.order_by('name', 'pk'))
+    for student in students:
+        student.present_days = present[student.pk]
+        student.late_days = late[student.pk]
+
+    report_data = []
+    for student in students:
+        absent_days = max(total_working_days - student.present_days - student.late_days, 0)
+
+        attendance_percentage = (
+            (student.present_days / total_working_days) * 100
+            if total_working_days > 0 else 0.0
+        )
+
+        report_data.append({
+            'student': student,
+            'present_days': student.present_days,
+            'late_days': student.late_days,
+            'absent_days': absent_days,
+            'total_working_days': total_working_days,
+            'attendance_percentage': round(attendance_percentage, 1)
+        })
+
+    return report_data, total_working_days
+
+
+def report_from_matrix(matrix):
+    """build_attendance_report's rows, computed from an already loaded AttendanceMatrix."""
+    total_working_days = matrix.working_days
+    present, late, absent = matrix.student_counts()
+    percentages = matrix.student_percentages()
+
+    report_data = [
+        {
+            'student': student,
+            'present_days': int(present[i]),
+            'late_days': int(late[i]),
+            'absent_days': int(absent[i]),
+            'total_working_days': total_working_days,
+            'attendance_percentage': round(float(percentages[i]), 1),
+        }
+        for i, student in enumerate(matrix.students)
+    ]
+    return report_data, total_working_days
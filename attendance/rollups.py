@@ -0,0 +1,153 @@
+# attendance/rollups.py
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import Student, Attendance, DailyAttendanceSummary, StudentMonthlyAttendance
+from .stats import invalidate_dashboard_stats
+
+STATUS_FIELDS = ['present', 'late', 'absent']
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def refresh_daily_summaries(dates):
+    """Recount DailyAttendanceSummary rows for the given dates."""
+    dates = set(dates)
+    if not dates:
+        return
+
+    counts = defaultdict(dict)
+    for row in Attendance.objects.filter(date__in=dates).values('date', 'status').annotate(n=Count('id')):
+        counts[row['date']][row['status']] = row['n']
+
+    total_active = Student.objects.filter(is_active=True).count()
+    DailyAttendanceSummary.objects.bulk_create(
+        [
+            DailyAttendanceSummary(
+                date=day,
+                total_active=total_active,
+                **{status: counts[day].get(status, 0) for status in STATUS_FIELDS}
+            )
+            for day in dates
+        ],
+        update_conflicts=True,
+        unique_fields=['date'],
+        update_fields=STATUS_FIELDS + ['total_active', 'updated_timestamp'],
+    )
+
+
+def refresh_monthly_rollups(student_months):
+    """Recount StudentMonthlyAttendance rows for (student pk, month start) pairs."""
+    by_month = defaultdict(set)
+    for student_pk, month in student_months:
+        by_month[month].add(student_pk)
+
+    for month, student_pks in by_month.items():
+        counts = defaultdict(dict)
+        rows = (
+            Attendance.objects
+            .filter(student_id__in=student_pks, date__range=[month, month_end(month)])
+            .values('student_id', 'status')
+            .annotate(n=Count('id'))
+        )
+        for row in rows:
+            counts[row['student_id']][row['status']] = row['n']
+
+        StudentMonthlyAttendance.objects.bulk_create(
+            [
+                StudentMonthlyAttendance(
+                    student_id=student_pk,
+                    month=month,
+                    **{status: counts[student_pk].get(status, 0) for status in STATUS_FIELDS}
+                )
+                for student_pk in student_pks
+            ],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['student', 'month'],
+            update_fields=STATUS_FIELDS,
+        )
+
+
+def attendance_written(changes):
+    """
+    Hook for every attendance write path.
+    `changes` is an iterable of (student pk, date) pairs that were written;
+    rollups for those keys are recounted and cached dashboard numbers dropped.
+    """
+    changes = set(changes)
+    if not changes:
+        return
+
+    dates = {day for _, day in changes}
+    with transaction.atomic():
+        refresh_daily_summaries(dates)
+        refresh_monthly_rollups({(student_pk, month_start(day)) for student_pk, day in changes})
+    invalidate_dashboard_stats(dates)
+
+
+def rebuild_rollups(batch_size=1000):
+    """Rebuild every summary row from the raw Attendance table."""
+    total_active = Student.objects.filter(is_active=True).count()
+
+    daily = defaultdict(dict)
+    for row in Attendance.objects.values('date', 'status').annotate(n=Count('id')).order_by():
+        daily[row['date']][row['status']] = row['n']
+
+    monthly = defaultdict(dict)
+    rows = (
+        Attendance.objects
+        .annotate(month=TruncMonth('date'))
+        .values('student_id', 'month', 'status')
+        .annotate(n=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        monthly[(row['student_id'], row['month'])][row['status']] = row['n']
+
+    with transaction.atomic():
+        DailyAttendanceSummary.objects.all().delete()
+        StudentMonthlyAttendance.objects.all().delete()
+        DailyAttendanceSummary.objects.bulk_create(
+            [
+                DailyAttendanceSummary(
+                    date=day,
+                    total_active=total_active,
+                    **{status: counts.get(status, 0) for status in STATUS_FIELDS}
+                )
+                for day, counts in daily.items()
+            ],
+            batch_size=batch_size,
+        )
+        StudentMonthlyAttendance.objects.bulk_create(
+            [
+                StudentMonthlyAttendance(
+                    student_id=student_pk,
+                    month=month,
+                    **{status: counts.get(status, 0) for status in STATUS_FIELDS}
+                )
+                for (student_pk, month), counts in monthly.items()
+            ],
+            batch_size=batch_size,
+        )
+    invalidate_dashboard_stats()
+
+    return len(daily), len(monthly)
+
+
+def refresh_today_headcount():
+    """Keep today's total_active in step when students are added or deactivated."""
+    refresh_daily_summaries([timezone.now().date()])
@@ -0,0 +1,141 @@
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import Student, Holiday, Attendance
+from .counters import apply_status_changes, backfill_counters, lock_students
+from .rollups import attendance_written, refresh_daily_summaries, refresh_today_headcount
+from .stats import invalidate_dashboard_stats
+from .thumbnails import queue_thumbnails
+from .workdays import invalidate_working_day_calendar
+
+# Attendance rows being deleted, per delete() call (keyed on its origin)
+_deleting = threading.local()
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+def holiday_changed(sender, instance, **kwargs):
+    """Any holiday change invalidates the cached working-day calendar once it is committed."""
+    transaction.on_commit(invalidate_working_day_calendar)
+
+
+@receiver(pre_save, sender=Attendance)
+def attendance_before_save(sender, instance, **kwargs):
+    """Remember the stored row so post_save can work out the counter changes."""
+    instance._previous_row = None
+    if instance.pk:
+        previous = Attendance.objects.filter(pk=instance.pk)
+        if transaction.get_connection().in_atomic_block:
+            # As in save_register: lock the students, then read the status being replaced
+            lock_students({instance.student_id, *previous.values_list('student_id', flat=True)})
+            previous = previous.select_for_update()
+        instance._previous_row = previous.values_list('student_id', 'date', 'status').first()
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, created, **kwargs):
+    """Single-row attendance saves (e.g. the admin change form) update counters and rollups."""
+    previous = getattr(instance, '_previous_row', None)
+    current = (instance.student_id, instance.date)
+
+    if previous is None:
+        changes = [(instance.student_id, instance.date, None, instance.status)]
+        written = [current]
+    elif previous[:2] == current:
+        changes = [(instance.student_id, instance.date, previous[2], instance.status)]
+        written = [current]
+    else:
+        # Moved to another student or date: count it as a delete plus an insert
+        changes = [previous + (None,), (instance.student_id, instance.date, None, instance.status)]
+        written = [previous[:2], current]
+
+    apply_status_changes(changes)
+    attendance_written(written)
+
+
+def _delete_batches():
+    if not hasattr(_deleting, 'batches'):
+        _deleting.batches = {}
+    return _deleting.batches
+
+
+@receiver(pre_delete, sender=Attendance)
+def attendance_before_delete(sender, instance, origin=None, **kwargs):
+    """Collect the rows one delete() call removes; pre_delete is sent for all of them first."""
+    _, rows, remaining = _delete_batches().setdefault(id(origin), (origin, {}, set()))
+    rows[instance.pk] = (instance.student_id, instance.date, instance.status)
+    remaining.add(instance.pk)
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, origin=None, **kwargs):
+    """
+    Update counters and rollups once, after the last row of a delete() call
+    (one row, a queryset, or a student's cascade) is gone, rather than per row.
+    """
+    batches = _delete_batches()
+    batch = batches.get(id(origin))
+    if batch is None:
+        rows = {instance.pk: (instance.student_id, instance.date, instance.status)}
+    else:
+        _, rows, remaining = batch
+        remaining.discard(instance.pk)
+        if remaining:
+            return
+        del batches[id(origin)]
+
+    if isinstance(origin, Student) or getattr(origin, 'model', None) is Student:
+        # The students go too, taking their counters and monthly rollups with them
+        dates = {day for _, day, _ in rows.values()}
+        refresh_daily_summaries(dates)
+        invalidate_dashboard_stats(dates)
+        return
+
+    apply_status_changes([(student_pk, day, status, None) for student_pk, day, status in rows.values()])
+    attendance_written([(student_pk, day) for student_pk, day, _ in rows.values()])
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_changed(sender, instance, **kwargs):
+    """Adding or deactivating students changes the dashboard headcount."""
+    refresh_today_headcount()
+    invalidate_dashboard_stats()
+
+
+@receiver(pre_save, sender=Student)
+def student_photo_changing(sender, instance, **kwargs):
+    """A new, replaced or cleared photo makes the recorded thumbnails stale."""
+    photo = instance.photo
+    previous = None
+    if instance.pk:
+        previous = Student.objects.filter(pk=instance.pk).values_list('photo', flat=True).first()
+    # An upload not yet written to storage has no final name, so it always counts as new
+    instance._photo_uploaded = bool(photo) and (not photo._committed or photo.name != previous)
+    if instance._photo_uploaded or not photo:
+        instance.photo_hash = ''
+
+
+@receiver(post_save, sender=Student)
+def student_photo_changed(sender, instance, **kwargs):
+    if getattr(instance, '_photo_uploaded', False):
+        transaction.on_commit(lambda: queue_thumbnails([instance.pk]))
+
+
+def counters_after_migrate(sender, using, verbosity=1, stdout=None, **kwargs):
+    """Counters added to a database that already holds attendance start at zero; fill them in."""
+    if using != DEFAULT_DB_ALIAS:
+        return
+    connection = connections[using]
+    table = Student._meta.db_table
+    with connection.cursor() as cursor:
+        if table not in connection.introspection.table_names(cursor):
+            return
+        columns = {column.name for column in connection.introspection.get_table_description(cursor, table)}
+    if 'total_count' not in columns:
+        return  # model changes not migrated yet (run makemigrations)
+
+    fixed = backfill_counters()
+    if fixed and verbosity and stdout:
+        stdout.write(f'  Backfilled attendance counters for {fixed} student(s)\n')
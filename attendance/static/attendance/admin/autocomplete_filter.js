@@ -0,0 +1,17 @@
+'use strict';
+{
+    // Reload the changelist with the picked object as the filter value.
+    const $ = django.jQuery;
+    $(function() {
+        $('select[data-filter-param]').on('change', function() {
+            const params = new URLSearchParams(window.location.search);
+            params.delete('p');
+            if (this.value) {
+                params.set(this.dataset.filterParam, this.value);
+            } else {
+                params.delete(this.dataset.filterParam);
+            }
+            window.location.search = params.toString();
+        });
+    });
+}
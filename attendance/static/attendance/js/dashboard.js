@@ -0,0 +1,26 @@
+// Weekly present chart on the dashboard; the series is embedded by json_script.
+document.addEventListener('DOMContentLoaded', function () {
+    const canvas = document.getElementById('weekly-chart');
+    const source = document.getElementById('weekly-data');
+    if (!canvas || !source || typeof Chart === 'undefined') {
+        return;
+    }
+
+    const weekly = JSON.parse(source.textContent);
+    new Chart(canvas, {
+        type: 'bar',
+        data: {
+            labels: weekly.map(function (day) { return day.date; }),
+            datasets: [{
+                label: 'Present',
+                data: weekly.map(function (day) { return day.present; }),
+                backgroundColor: '#27ae60',
+            }],
+        },
+        options: {
+            maintainAspectRatio: false,
+            plugins: { legend: { display: false } },
+            scales: { y: { beginAtZero: true, ticks: { precision: 0 } } },
+        },
+    });
+});
@@ -0,0 +1,20 @@
+// Posts the register as one JSON field so large rosters stay under
+// DATA_UPLOAD_MAX_NUMBER_FIELDS; without JavaScript the radios post as usual.
+document.addEventListener('DOMContentLoaded', function () {
+    const form = document.getElementById('register-form');
+    if (!form) {
+        return;
+    }
+
+    form.addEventListener('submit', function () {
+        const register = {};
+        const radios = form.querySelectorAll('input[type="radio"][name^="attendance-"]');
+        radios.forEach(function (radio) {
+            if (radio.checked) {
+                register[radio.name.slice('attendance-'.length)] = radio.value;
+            }
+            radio.disabled = true;
+        });
+        form.elements['register'].value = JSON.stringify(register);
+    });
+});
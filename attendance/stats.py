@@ -0,0 +1,106 @@
+# attendance/stats.py
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .analytics import AttendanceMatrix, matrix_engine_enabled
+from .models import Student, Attendance, DailyAttendanceSummary
+
+DASHBOARD_CACHE_KEY = 'attendance:dashboard-stats:{date}'
+# Days behind the dashboard's weekday pattern (numpy engine only)
+WEEKDAY_PATTERN_DAYS = 28
+
+
+def _cache_key(today):
+    return DASHBOARD_CACHE_KEY.format(date=today.isoformat())
+
+
+def present_by_day_query(dates):
+    """(date, present count) from raw attendance, for days without a summary row."""
+    return (
+        Attendance.objects.filter(date__in=dates, status='present')
+        .values('date')
+        .annotate(present=Count('id'))
+        .values_list('date', 'present')
+    )
+
+
+def compute_dashboard_stats(today):
+    """Headline numbers and the 7-day present series from the daily rollup table."""
+    if matrix_engine_enabled():
+        return compute_matrix_dashboard_stats(today)
+
+    week_start = today - timedelta(days=6)
+
+    present_by_date = dict(
+        DailyAttendanceSummary.objects.filter(date__range=[week_start, today])
+        .values_list('date', 'present')
+    )
+
+    # Days without a summary row (nothing marked yet, or rollups not built) fall back to raw rows
+    missing = [week_start + timedelta(days=i) for i in range(7)]
+    missing = [day for day in missing if day not in present_by_date]
+    if missing:
+        present_by_date.update(present_by_day_query(missing))
+
+    weekly_data = []
+    for i in range(6, -1, -1):
+        date = today - timedelta(days=i)
+        weekly_data.append({
+            'date': date.strftime('%m/%d'),
+            'present': present_by_date.get(date, 0)
+        })
+
+    return {
+        'total_students': Student.objects.filter(is_active=True).count(),
+        'present_today': present_by_date.get(today, 0),
+        'weekly_data': weekly_data,
+    }
+
+
+def compute_matrix_dashboard_stats(today):
+    """
+    compute_dashboard_stats from a four-week AttendanceMatrix, which also
+    yields the attendance rate per weekday. Counts cover active students only.
+    """
+    matrix = AttendanceMatrix.load(today - timedelta(days=WEEKDAY_PATTERN_DAYS - 1), today)
+    present = matrix.daily_totals()['present']
+
+    weekly_data = [
+        {'date': day.strftime('%m/%d'), 'present': int(count)}
+        for day, count in zip(matrix.dates[-7:], present[-7:])
+    ]
+    return {
+        'total_students': len(matrix.students),
+        'present_today': int(present[-1]),
+        'weekly_data': weekly_data,
+        'weekday_rates': matrix.weekday_rates(),
+    }
+
+
+def get_dashboard_stats(today=None):
+    """Cached dashboard numbers; recomputed at most once per timeout unless invalidated."""
+    today = today or timezone.now().date()
+    key = _cache_key(today)
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(today)
+        cache.set(key, stats, getattr(settings, 'DASHBOARD_STATS_CACHE_TIMEOUT', 60))
+    return stats
+
+
+def invalidate_dashboard_stats(dates=None):
+    """
+    Drop cached dashboard numbers after a write.
+    Only today's entry is affected by changes dated within the last week, so
+    writes to older dates leave the cache alone.
+    """
+    today = timezone.now().date()
+    if dates is not None and not any(today - timedelta(days=6) <= d <= today for d in dates):
+        return
+    cache.delete(_cache_key(today))
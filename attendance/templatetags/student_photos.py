@@ -0,0 +1,20 @@
+from django import template
+
+from attendance.thumbnails import thumbnail_url
+
+register = template.Library()
+
+
+@register.inclusion_tag('attendance/_student_photo.html')
+def student_photo(student, size='small', width=50, css_class='rounded-circle'):
+    """
+    <picture> for a student's photo: WebP thumbnail with a JPEG fallback, or the
+    original upload until its thumbnails have been generated.
+    """
+    return {
+        'student': student,
+        'webp_url': thumbnail_url(student, size, 'webp'),
+        'jpeg_url': thumbnail_url(student, size, 'jpg'),
+        'width': width,
+        'css_class': css_class,
+    }
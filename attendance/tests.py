@@ -0,0 +1,500 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from .absences import AbsenceReport, absence_runs
+from .backends import TeacherBackend
+from .counters import find_inconsistent_counters
+from .faces import (
+    ALREADY_MARKED, FaceIndex, build_face_index, check_in_faces, get_face_index, load_image, refresh_face_embeddings,
+)
+from .marking import save_register
+from .middleware import ViewMetrics
+from .models import Attendance, DailyAttendanceSummary, Holiday, Student, StudentMonthlyAttendance, Teacher
+from .reports import build_attendance_report, report_count_queries
+from .rollups import refresh_daily_summaries
+from .workdays import get_working_day_calendar, invalidate_working_day_calendar
+from .writebehind import AttendanceWriteBuffer
+
+
+def create_teacher(username='teacher'):
+    user = User.objects.create_user(username, password='password')
+    return Teacher.objects.create(user=user, name='Test Teacher', subject='Testing', phone='0')
+
+
+def create_students(count, prefix='ST'):
+    return Student.objects.bulk_create([
+        Student(student_id=f'{prefix}{i:04d}', name=f'Student {i:04d}', email=f's{i}@example.com', phone='0', address='-')
+        for i in range(count)
+    ])
+
+
+class StudentListQueryCountTests(TestCase):
+    # session, user with teacher profile, page count, page of students
+    EXPECTED_QUERIES = 4
+
+    def setUp(self):
+        self.teacher = create_teacher()
+        self.client.force_login(self.teacher.user)
+
+    def assert_student_list_queries(self, roster_size):
+        students = create_students(roster_size, prefix=f'R{roster_size}-')
+        save_register({s.student_id: 'present' for s in students}, date(2026, 1, 5), self.teacher)
+
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = self.client.get(reverse('student_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].paginator.count, roster_size)
+        self.assertEqual(response.context['students'][0].attendance_percentage, 100.0)
+
+    def test_small_roster(self):
+        self.assert_student_list_queries(3)
+
+    def test_query_count_does_not_grow_with_roster(self):
+        self.assert_student_list_queries(120)
+
+
+class HotQueryPlanTests(TestCase):
+    """benchmarks/explain_hot_queries.py as a test: each hot query must use its index."""
+
+    def test_hot_queries_use_their_indexes(self):
+        from benchmarks.explain_hot_queries import check_plans, seed
+
+        seed()
+        for label, indexes, plan, ok in check_plans(date.today()):
+            with self.subTest(label):
+                self.assertTrue(ok, f"{label} does not use {' | '.join(indexes)}:\n{plan}")
+
+
+class AttendanceApiValidationTests(TestCase):
+    def setUp(self):
+        self.teacher = create_teacher()
+        self.client.force_login(self.teacher.user)
+        create_students(1)
+
+    def post(self, payload):
+        return self.client.post(reverse('attendance_api'), json.dumps(payload), content_type='application/json')
+
+    def test_valid_mark_is_saved(self):
+        response = self.post({'student_id': 'ST0000', 'status': 'present'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], {'ST0000': 'created'})
+
+    def test_malformed_fields_are_rejected(self):
+        for payload in [
+            {'date': 20261010, 'student_id': 'ST0000', 'status': 'present'},
+            {'student_id': 'ST0000', 'status': ['present']},
+            {'student_id': 17, 'status': 'present'},
+            {'marks': [{'student_id': 'ST0000', 'status': {'present': True}}]},
+        ]:
+            with self.subTest(payload=payload):
+                response = self.post(payload)
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()['success'])
+
+
+class BatchAttendanceApiTests(TestCase):
+    def setUp(self):
+        self.teacher = create_teacher()
+        self.client.force_login(self.teacher.user)
+        self.student, = create_students(1)
+        save_register({'ST0000': 'present'}, date.today(), self.teacher)
+
+    def test_renamed_student_changes_etag(self):
+        url = reverse('batch_attendance_data') + '?student_id=ST0000'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.student.name = 'Renamed'
+        self.student.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['students'][0]['name'], 'Renamed')
+
+
+class ViewMetricsTests(TestCase):
+    def test_render_keeps_full_precision(self):
+        metrics = ViewMetrics()
+        metrics.record('dashboard', requests=12345678, sql_seconds=1234.56789)
+        metrics.record('dashboard', sql_seconds=0.1)
+
+        rendered = metrics.render()
+        self.assertIn('attendance_view_requests_total{view="dashboard"} 12345678\n', rendered)
+        self.assertIn(f'attendance_view_sql_seconds_total{{view="dashboard"}} {1234.56789 + 0.1!r}\n', rendered)
+
+
+class WorkingDayCalendarTests(TestCase):
+    def test_holiday_added_elsewhere_is_seen_after_max_age(self):
+        invalidate_working_day_calendar()
+        self.addCleanup(invalidate_working_day_calendar)
+        day = date(2026, 3, 2)
+        self.assertTrue(get_working_day_calendar().is_working_day(day))
+
+        # As written by another worker whose cache version bump never reaches this one
+        Holiday.objects.bulk_create([Holiday(date=day, description='Closure', created_by=create_teacher())])
+        self.assertTrue(get_working_day_calendar().is_working_day(day))
+
+        later = time.monotonic() + 61
+        with override_settings(WORKING_DAY_CALENDAR_MAX_AGE=60), mock.patch('attendance.workdays.time.monotonic', return_value=later):
+            self.assertFalse(get_working_day_calendar().is_working_day(day))
+
+
+class MarkAttendanceRegisterTests(TestCase):
+    def setUp(self):
+        self.teacher = create_teacher()
+        self.client.force_login(self.teacher.user)
+
+    def test_register_larger_than_field_limit_is_saved(self):
+        create_students(1200)
+        register = {f'ST{i:04d}': 'late' if i % 2 else 'present' for i in range(1200)}
+
+        response = self.client.post(reverse('mark_attendance'), {'register': json.dumps(register)})
+
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+        self.assertEqual(Attendance.objects.count(), 1200)
+        self.assertEqual(Attendance.objects.filter(status='late').count(), 600)
+
+    def test_per_student_fields_still_accepted(self):
+        create_students(2)
+
+        self.client.post(reverse('mark_attendance'), {'attendance-ST0000': 'present', 'attendance-ST0001': 'absent'})
+
+        self.assertEqual(
+            dict(Attendance.objects.values_list('student__student_id', 'status')),
+            {'ST0000': 'present', 'ST0001': 'absent'},
+        )
+
+
+class AttendanceReportTests(TestCase):
+    def setUp(self):
+        self.teacher = create_teacher()
+        self.first, self.second = create_students(2)
+        marks = [
+            (date(2026, 1, 30), 'present', 'absent'),
+            (date(2026, 2, 2), 'late', 'present'),
+            (date(2026, 2, 16), 'present', 'absent'),
+            (date(2026, 3, 2), 'present', 'late'),
+            (date(2026, 3, 4), 'present', 'present'),
+        ]
+        for day, first, second in marks:
+            with self.captureOnCommitCallbacks(execute=True):  # rollups are refreshed on commit
+                save_register({'ST0000': first, 'ST0001': second}, day, self.teacher)
+
+    def counts(self, start_date, end_date):
+        report_data, _ = build_attendance_report(start_date, end_date)
+        return {row['student'].student_id: (row['present_days'], row['late_days']) for row in report_data}
+
+    def test_whole_months_read_from_rollups_and_edges_from_marks(self):
+        self.assertEqual(len(report_count_queries(date(2026, 1, 28), date(2026, 3, 3))), 3)
+        self.assertEqual(self.counts(date(2026, 1, 28), date(2026, 3, 3)), {'ST0000': (3, 1), 'ST0001': (1, 1)})
+        self.assertEqual(self.counts(date(2026, 2, 1), date(2026, 2, 28)), {'ST0000': (1, 1), 'ST0001': (1, 0)})
+        self.assertEqual(self.counts(date(2026, 3, 2), date(2026, 3, 3)), {'ST0000': (1, 0), 'ST0001': (0, 1)})
+
+    def test_rollups_follow_deleted_marks(self):
+        Attendance.objects.filter(date=date(2026, 2, 16)).delete()
+        self.assertEqual(self.counts(date(2026, 1, 1), date(2026, 3, 31)), {'ST0000': (3, 1), 'ST0001': (2, 1)})
+
+
+class WriteBehindJournalTests(TestCase):
+    def setUp(self):
+        self.teacher = create_teacher()
+        create_students(2)
+        self.journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.journal_dir)
+
+    def start_buffer(self):
+        # No timed or size-triggered flushes: marks stay journaled until stop() or recovery
+        buffer = AttendanceWriteBuffer(self.journal_dir, flush_interval=3600, max_records=10**6)
+        buffer.start()
+        return buffer
+
+    def crash(self, buffer):
+        """Stop the flusher without writing anything and release the lock, as a dead process would."""
+        with buffer._lock:
+            buffer._pending = {}
+        buffer._stopping.set()
+        buffer._wake.set()
+        buffer._thread.join()
+        buffer._journal.close()
+        buffer._owner_lock.close()
+
+    def test_starting_worker_leaves_live_journals_alone(self):
+        first = self.start_buffer()
+        second = self.start_buffer()
+        first.submit('ST0000', 'present', self.teacher.pk, date(2026, 1, 5))
+
+        with open(first._journal_path()) as journal:
+            self.assertIn('ST0000', journal.read())
+        self.assertEqual(second.recover(), 0)
+        self.assertTrue(os.path.exists(first._journal_path()))
+
+        self.crash(first)
+        second.stop()
+
+    def test_journal_of_dead_worker_is_replayed(self):
+        crashed = self.start_buffer()
+        crashed.submit('ST0000', 'present', self.teacher.pk, date(2026, 1, 5))
+        crashed.submit('ST0001', 'late', self.teacher.pk, date(2026, 1, 5))
+        crashed.submit('ST0000', 'absent', self.teacher.pk, date(2026, 1, 5))
+        self.crash(crashed)
+        self.assertFalse(Attendance.objects.exists())
+
+        survivor = self.start_buffer()
+        self.assertEqual(
+            dict(Attendance.objects.values_list('student__student_id', 'status')),
+            {'ST0000': 'absent', 'ST0001': 'late'},
+        )
+        survivor.stop()
+        self.assertEqual(os.listdir(self.journal_dir), ['recovery.lock'])
+
+
+class AttendanceCounterTests(TestCase):
+    def setUp(self):
+        self.teacher = create_teacher()
+        self.student, = create_students(1)
+        self.days = [date(2026, 1, day) for day in range(5, 10)]
+
+    def counters(self):
+        self.student.refresh_from_db()
+        return self.student.present_count, self.student.late_count, self.student.absent_count, self.student.total_count
+
+    def run_admin_action(self, action):
+        admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:attendance_attendance_changelist'), {
+            'action': action,
+            '_selected_action': list(Attendance.objects.values_list('pk', flat=True)),
+        })
+        self.assertEqual(response.status_code, 302)
+
+    def test_admin_action_counts_every_row_of_a_student(self):
+        for day in self.days:
+            save_register({self.student.student_id: 'absent'}, day, self.teacher)
+        self.assertEqual(self.counters(), (0, 0, 5, 5))
+
+        self.run_admin_action('mark_present')
+        self.assertEqual(self.counters(), (5, 0, 0, 5))
+        self.assertEqual(self.student.last_attended_date, self.days[-1])
+        self.assertFalse(find_inconsistent_counters().exists())
+
+    def test_counters_backfilled_for_rows_written_before_them(self):
+        # Rows from before the counters existed, as on an upgraded database
+        Attendance.objects.bulk_create([
+            Attendance(student=self.student, date=day, status='present', marked_by=self.teacher) for day in self.days
+        ])
+        self.assertEqual(self.counters(), (0, 0, 0, 0))
+
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')  # end of `migrate`
+        self.assertEqual(self.counters(), (5, 0, 0, 5))
+
+        self.run_admin_action('mark_absent')
+        self.assertEqual(self.counters(), (0, 0, 5, 5))
+        self.assertFalse(find_inconsistent_counters().exists())
+
+    def test_saving_a_stale_student_keeps_counters(self):
+        stale = Student.objects.get(pk=self.student.pk)
+        save_register({self.student.student_id: 'late'}, self.days[0], self.teacher)
+
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertEqual(self.counters(), (0, 1, 0, 1))
+        self.assertEqual(self.student.name, 'Renamed')
+
+    def test_queryset_delete_updates_counters_and_rollups(self):
+        other, = create_students(1, prefix='OT')
+        for day in self.days:
+            save_register({self.student.student_id: 'present', other.student_id: 'late'}, day, self.teacher)
+
+        with CaptureQueriesContext(connection) as queries:
+            Attendance.objects.filter(date__in=self.days[:3]).delete()
+        self.assertLess(len(queries), 20)
+
+        self.assertEqual(self.counters(), (2, 0, 0, 2))
+        self.assertFalse(find_inconsistent_counters().exists())
+        self.assertEqual(
+            StudentMonthlyAttendance.objects.get(student=other, month=date(2026, 1, 1)).late, 2,
+        )
+
+    def test_deleting_a_student_recounts_days_once(self):
+        days = [date(2026, 1, 1) + timedelta(days=n) for n in range(120)]
+        Attendance.objects.bulk_create([
+            Attendance(student=self.student, date=day, status='present', marked_by=self.teacher) for day in days
+        ])
+        refresh_daily_summaries(days)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.student.delete()
+        self.assertLess(len(queries), 30)
+        self.assertFalse(DailyAttendanceSummary.objects.exclude(present=0).exists())
+        self.assertFalse(StudentMonthlyAttendance.objects.exists())
+
+
+class AbsenceStreakTests(TestCase):
+    def test_absence_runs_reset_on_attended_days(self):
+        absent = np.array([
+            [1, 1, 0, 1, 1, 1],
+            [0, 0, 0, 0, 0, 0],
+            [1, 0, 1, 0, 1, 1],
+        ], dtype=bool)
+        np.testing.assert_array_equal(absence_runs(absent), [
+            [1, 2, 0, 1, 2, 3],
+            [0, 0, 0, 0, 0, 0],
+            [1, 0, 1, 0, 1, 2],
+        ])
+
+    def test_streaks_span_weekends_and_holidays(self):
+        teacher = create_teacher()
+        regular, truant, sometimes = create_students(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            Holiday.objects.create(date=date(2026, 1, 12), description='Holiday', created_by=teacher)
+
+        # Mon 5 - Fri 9, then (weekend, Monday holiday) Tue 13
+        for day in [5, 6, 7, 8, 9, 13]:
+            register = {regular.student_id: 'present', sometimes.student_id: 'absent' if day == 7 else 'late'}
+            if day < 13:
+                # No mark at all on the 13th also counts as absent
+                register[truant.student_id] = 'absent' if day >= 8 else 'present'
+            save_register(register, date(2026, 1, day), teacher)
+        # A mark taken on the holiday does not make it a school day
+        save_register({regular.student_id: 'present'}, date(2026, 1, 12), teacher)
+
+        # Days before records begin are not school days and count for nobody
+        report = AbsenceReport.for_date(date(2026, 1, 13), lookback_days=30, threshold=90, streak_alert=3)
+        rows = {row['student'].student_id: row for row in report.rows(flagged_only=False)}
+
+        self.assertEqual(rows[regular.student_id]['attendance_rate'], 100.0)
+        self.assertFalse(rows[regular.student_id]['chronic'] or rows[regular.student_id]['on_streak'])
+        self.assertEqual(
+            {key: rows[truant.student_id][key] for key in ('current_streak', 'current_streak_start', 'longest_streak', 'attendance_rate')},
+            {'current_streak': 3, 'current_streak_start': date(2026, 1, 8), 'longest_streak': 3, 'attendance_rate': 50.0},
+        )
+        self.assertTrue(rows[truant.student_id]['on_streak'])
+        self.assertEqual(rows[sometimes.student_id]['current_streak'], 0)
+        self.assertEqual(rows[sometimes.student_id]['longest_streak'], 1)
+        self.assertTrue(rows[sometimes.student_id]['chronic'])
+        self.assertFalse(rows[sometimes.student_id]['on_streak'])
+
+        self.assertEqual([row['student'] for row in report.rows()], [truant, sometimes])
+
+    def test_days_before_enrolment_are_not_absences(self):
+        teacher = create_teacher()
+        regular, newcomer = create_students(2)
+        Student.objects.filter(pk=newcomer.pk).update(created_date=timezone.make_aware(datetime(2026, 1, 14, 9)))
+
+        for day in range(5, 17):
+            if date(2026, 1, day).weekday() < 5:
+                register = {regular.student_id: 'present'}
+                if day in (14, 15):
+                    register[newcomer.student_id] = 'present'
+                save_register(register, date(2026, 1, day), teacher)
+
+        report = AbsenceReport.for_date(date(2026, 1, 16), lookback_days=30, threshold=90, streak_alert=3)
+        row, = [row for row in report.rows(flagged_only=False) if row['student'] == newcomer]
+
+        self.assertEqual(
+            {key: row[key] for key in ('current_streak', 'longest_streak', 'attendance_rate', 'rolling_rate')},
+            {'current_streak': 1, 'longest_streak': 1, 'attendance_rate': 66.7, 'rolling_rate': 66.7},
+        )
+
+
+def noise_picture(seed, size=(64, 64)):
+    pixels = np.random.default_rng(seed).integers(0, 256, (*size, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class FaceIndexTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        overrides = override_settings(
+            FACE_CHECKIN=True,
+            FACE_EMBEDDING_EXTRACTOR='attendance.faces.PixelExtractor',
+            FACE_INDEX_ROOT=os.path.join(self.root, 'index'),
+            MEDIA_ROOT=os.path.join(self.root, 'media'),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.teacher = create_teacher()
+
+    def test_match_returns_nearest_student_within_tolerance(self):
+        embeddings = np.eye(4, dtype=np.float32)
+        index = FaceIndex('test', np.array([10, 20, 30, 40]), embeddings)
+        probes = [embeddings[2] * 0.9, [0.5, 0.5, 0.5, 0.5]]
+        self.assertEqual([pk for pk, _ in index.match(probes, tolerance=0.2)], [30, None])
+        self.assertEqual(FaceIndex('empty', np.array([]), np.empty((0, 4), np.float32)).match(probes, 0.2), [(None, None)] * 2)
+
+    def test_photo_check_in_marks_matched_students_once(self):
+        students = create_students(3)
+        for seed, student in enumerate(students):
+            student.photo.save(f'{student.student_id}.png', ContentFile(noise_picture(seed)))
+        Student.objects.update(photo_hash='digest')
+        students = list(Student.objects.order_by('pk'))
+
+        self.assertEqual(refresh_face_embeddings(students), 3)
+        self.assertEqual(refresh_face_embeddings(students), 0)  # photos unchanged
+        self.assertEqual(build_face_index(), 3)
+        index = get_face_index()
+        self.assertEqual(len(index), 3)
+
+        def check_in(seed):
+            picture = load_image(io.BytesIO(noise_picture(seed)))
+            return check_in_faces(picture, self.teacher, index, attendance_date=date(2026, 1, 5))
+
+        faces, results = check_in(1)
+        self.assertEqual(faces, 1)
+        self.assertEqual([(r['student_id'], r['outcome']) for r in results], [(students[1].student_id, 'created')])
+        self.assertEqual(Attendance.objects.get().status, 'present')
+
+        self.assertEqual(check_in(1)[1][0]['outcome'], ALREADY_MARKED)
+        self.assertEqual(check_in(99)[1], [])  # nobody on file
+
+    def test_decompression_bomb_upload_is_rejected(self):
+        self.client.force_login(self.teacher.user)
+        upload = SimpleUploadedFile('bomb.png', noise_picture(0, size=(100, 100)), content_type='image/png')
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            response = self.client.post(reverse('face_checkin'), {'image': upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+
+class TeacherBackendTests(TestCase):
+    def setUp(self):
+        self.teacher = create_teacher()
+
+    def test_session_user_comes_with_teacher_profile(self):
+        other = User.objects.create_user('not-a-teacher', password='password')
+        backend = TeacherBackend()
+        with self.assertNumQueries(2):
+            user = backend.get_user(self.teacher.user.pk)
+            other = backend.get_user(other.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.teacher, self.teacher)
+            self.assertFalse(hasattr(other, 'teacher'))
+
+    def test_failed_login_checks_the_password_once(self):
+        with self.assertNumQueries(1):
+            response = self.client.post(reverse('teacher_login'), {'username': 'teacher', 'password': 'wrong'})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(reverse('teacher_login'), {'username': 'teacher', 'password': 'password'})
+        self.assertRedirects(response, reverse('dashboard'))
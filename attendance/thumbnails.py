@@ -0,0 +1,173 @@
+# attendance/thumbnails.py
+
+import atexit
+import hashlib
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+from .faces import build_face_index, refresh_face_embeddings
+from .models import Student
+
+logger = logging.getLogger(__name__)
+
+# Square edge in pixels; roughly twice the largest size each is displayed at
+THUMBNAIL_SIZES = {'small': 100, 'medium': 240}
+# URL extension -> (Pillow format, content type, save options)
+THUMBNAIL_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def photo_digest(photo):
+    """SHA-256 of the stored photo's bytes; thumbnails are cached under this key."""
+    digest = hashlib.sha256()
+    with photo.open('rb') as source:
+        for chunk in source.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def thumbnail_path(digest, size, ext):
+    return os.path.join(settings.THUMBNAIL_ROOT, digest[:2], f'{digest}-{size}.{ext}')
+
+
+def _render(photo, digest, force=False):
+    """Write every missing size/format for one photo; returns the number of files written."""
+    wanted = [
+        (size, ext) for size in THUMBNAIL_SIZES for ext in THUMBNAIL_FORMATS
+        if force or not os.path.exists(thumbnail_path(digest, size, ext))
+    ]
+    if not wanted:
+        return 0
+
+    with photo.open('rb') as source, Image.open(source) as image:
+        # JPEG decoders can scale down while decoding, which is far cheaper than a full decode
+        largest = max(THUMBNAIL_SIZES.values())
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+        for size, ext in wanted:
+            pixels = THUMBNAIL_SIZES[size]
+            fitted = ImageOps.fit(image, (pixels, pixels), method=Image.Resampling.LANCZOS)
+            image_format, _, options = THUMBNAIL_FORMATS[ext]
+            path = thumbnail_path(digest, size, ext)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write aside and rename so readers never see a half-written file
+            partial = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            fitted.save(partial, image_format, **options)
+            os.replace(partial, path)
+    return len(wanted)
+
+
+def generate_thumbnails(student, force=False):
+    """
+    Build the thumbnails for a student's current photo and record its digest.
+    The digest is only stored if the photo hasn't been replaced meanwhile.
+    Returns the digest, or '' when the student has no photo.
+    """
+    if not student.photo:
+        return ''
+
+    digest = photo_digest(student.photo)
+    _render(student.photo, digest, force=force)
+    if digest != student.photo_hash:
+        Student.objects.filter(pk=student.pk, photo=student.photo.name).update(photo_hash=digest)
+        student.photo_hash = digest
+    return digest
+
+
+def thumbnail_url(student, size, ext):
+    """URL of a cached thumbnail, or None until the worker has produced it."""
+    if not student.photo_hash:
+        return None
+    return reverse('student_photo_thumbnail', kwargs={'digest': student.photo_hash, 'size': size, 'ext': ext})
+
+
+class ThumbnailWorker:
+    """
+    Background thread that renders thumbnails (and, with FACE_CHECKIN, face
+    embeddings) for students queued by pk, so uploads return without waiting
+    on image decoding. Work still queued at shutdown is lost; thumbnails are
+    rendered on first request instead, or by `manage.py generate_thumbnails`,
+    and embeddings by `manage.py build_face_index`.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='student-thumbnails', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, student_pks):
+        for pk in student_pks:
+            self._queue.put(pk)
+
+    def _run(self):
+        index_stale = False
+        while True:
+            pk = self._queue.get()
+            if pk is None:
+                break
+            try:
+                student = Student.objects.filter(pk=pk).first()
+                if student is not None:
+                    generate_thumbnails(student)
+                    if settings.FACE_CHECKIN and refresh_face_embeddings([student]):
+                        index_stale = True
+                # Publish the face index once per burst of uploads, not per photo
+                if index_stale and self._queue.empty():
+                    index_stale = False
+                    build_face_index()
+            except Exception:
+                logger.exception(f"Thumbnail generation failed for student {pk}")
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def join(self):
+        """Block until everything queued so far is processed."""
+        self._queue.join()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_thumbnail_worker():
+    """The process-wide worker, started on first use."""
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = ThumbnailWorker()
+            _worker.start()
+            atexit.register(_worker.stop)
+        return _worker
+
+
+def queue_thumbnails(student_pks):
+    """Render thumbnails in the background, or inline when THUMBNAIL_WORKER is off."""
+    if settings.THUMBNAIL_WORKER:
+        get_thumbnail_worker().submit(student_pks)
+        return
+    students = list(Student.objects.filter(pk__in=student_pks))
+    for student in students:
+        generate_thumbnails(student)
+    if settings.FACE_CHECKIN and refresh_face_embeddings(students):
+        build_face_index()
@@ -15,15 +15,24 @@ urlpatterns = [
     path('students/add/', views.student_create, name='student_create'),
     path('students/<int:pk>/edit/', views.student_update, name='student_update'),
     path('students/<int:pk>/delete/', views.student_delete, name='student_delete'),
+    path('students/photos/<slug:digest>/<slug:size>.<slug:ext>', views.student_photo_thumbnail, name='student_photo_thumbnail'),
 
     # Attendance (register-style)
     path('attendance/mark/', views.mark_attendance, name='mark_attendance'),
     path('attendance/report/', views.attendance_report, name='attendance_report'),
+    path('attendance/absences/', views.absence_report, name='absence_report'),
+    path('attendance/export/', views.export_attendance, name='export_attendance'),
 
     # Holiday Management
     path('holidays/', views.holiday_management, name='holiday_management'),
     path('holidays/<int:pk>/delete/', views.delete_holiday, name='delete_holiday'),
 
+    # Instrumentation (only when ATTENDANCE_INSTRUMENTATION is enabled)
+    path('metrics/', views.metrics, name='metrics'),
+
     # API endpoints
     path('api/student/<str:student_id>/attendance/', views.get_student_attendance_data, name='student_attendance_data'),
+    path('api/attendance/', views.attendance_api, name='attendance_api'),
+    path('api/checkin/face/', views.face_checkin, name='face_checkin'),
+    path('api/attendance/batch/', views.batch_attendance_data, name='batch_attendance_data'),
 ]
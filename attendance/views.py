@@ -4,18 +4,51 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Count, Max, Q
 from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+import hashlib
 import json
 import logging
+import os
 
-from .models import Student, Teacher, Attendance, Holiday
+from .models import Student, Attendance, Holiday
+from .backends import aget_teacher
 from .forms import StudentForm, HolidayForm
+from .reports import build_attendance_report, report_from_matrix
+from .analytics import AttendanceMatrix, matrix_engine_enabled
+from .absences import AbsenceReport
+from .faces import UNREADABLE_IMAGE_ERRORS, check_in_faces, get_face_index, load_image
+from .workdays import get_working_day_calendar
+from .marking import save_register, VALID_STATUSES, NOT_FOUND, INVALID_STATUS
+from .writebehind import get_write_buffer
+from .middleware import view_metrics
+from .stats import get_dashboard_stats
+from .exports import EXPORT_FORMATS, filter_export_queryset
+from .thumbnails import THUMBNAIL_SIZES, THUMBNAIL_FORMATS, generate_thumbnails, thumbnail_path
 
 logger = logging.getLogger(__name__)
 
+STUDENTS_PER_PAGE = 50
+REGISTER_CHUNK_SIZE = 200
+REGISTER_ROWS_MARKER = '<!-- register-rows -->'
+
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+API_CACHE_TIMEOUT = 300
+API_STATUS_CODES = {'present': 'P', 'absent': 'A', 'late': 'L'}
+QUEUED = 'queued'
+
+THUMBNAIL_CACHE_SECONDS = 365 * 24 * 60 * 60
+
 
 def teacher_login(request):
     """Teacher login view"""
@@ -34,35 +67,42 @@ def teacher_login(request):
     return render(request, 'attendance/login.html')
 
 
+def recent_attendance_query(day):
+    """The dashboard's ten latest marks for `day`."""
+    return Attendance.objects.select_related('student', 'marked_by').filter(
+        date=day
+    ).order_by('-created_timestamp')[:10]
+
+
+def active_students_query(query=''):
+    """Active students by name, as the student list and the register show them, optionally searched."""
+    students = Student.objects.filter(is_active=True)
+    if query:
+        students = students.filter(Q(student_id__icontains=query) | Q(name__icontains=query))
+    return students.order_by('name', 'pk')
+
+
+def register_prefill_query(day):
+    """(student pk, status) of the marks already saved for `day`."""
+    return Attendance.objects.filter(date=day).values_list('student_id', 'status')
+
+
 @login_required
 def dashboard(request):
     """Main dashboard view"""
-    total_students = Student.objects.filter(is_active=True).count()
     today = timezone.now().date()
-    present_today = Attendance.objects.filter(date=today, status='present').count()
+    stats = get_dashboard_stats(today)
+    total_students = stats['total_students']
+    present_today = stats['present_today']
 
     if total_students > 0:
         attendance_percentage = (present_today / total_students) * 100
     else:
         attendance_percentage = 0
 
-    recent_attendance = Attendance.objects.select_related('student').filter(
-        date=today
-    ).order_by('-created_timestamp')[:10]
+    recent_attendance = recent_attendance_query(today)
 
-    upcoming_holidays = Holiday.objects.filter(
-        date__gte=today
-    ).order_by('date')[:5]
-
-    weekly_data = []
-    for i in range(7):
-        date = today - timedelta(days=i)
-        present_count = Attendance.objects.filter(date=date, status='present').count()
-        weekly_data.append({
-            'date': date.strftime('%m/%d'),
-            'present': present_count
-        })
-    weekly_data.reverse()
+    upcoming_holidays = get_working_day_calendar().upcoming_holidays(today, limit=5)
 
     context = {
         'total_students': total_students,
@@ -71,7 +111,8 @@ def dashboard(request):
         'recent_attendance': recent_attendance,
         'upcoming_holidays': upcoming_holidays,
         'current_date': today,
-        'weekly_data': json.dumps(weekly_data),
+        'weekly_data': stats['weekly_data'],
+        'weekday_rates': stats.get('weekday_rates'),
     }
 
     return render(request, 'attendance/dashboard.html', context)
@@ -79,22 +120,27 @@ def dashboard(request):
 
 @login_required
 def student_list(request):
-    """List all students"""
-    students = Student.objects.filter(is_active=True).order_by('name')
+    """List active students with paginated search and per-student attendance totals"""
+    query = request.GET.get('q', '').strip()
 
-    for student in students:
-        total_days = Attendance.objects.filter(student=student).count()
-        present_days = Attendance.objects.filter(student=student, status='present').count()
+    # Present/total counts come from the counters stored on Student, so the page
+    # costs a fixed number of queries no matter how many students are listed.
+    students = active_students_query(query)
 
-        if total_days > 0:
-            student.attendance_percentage = round((present_days / total_days) * 100, 1)
+    paginator = Paginator(students, STUDENTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    for student in page_obj:
+        if student.total_count > 0:
+            student.attendance_percentage = round((student.present_count / student.total_count) * 100, 1)
         else:
             student.attendance_percentage = 0
 
-        student.total_days = total_days
-        student.present_days = present_days
-
-    return render(request, 'attendance/student_list.html', {'students': students})
+    return render(request, 'attendance/student_list.html', {
+        'students': page_obj,
+        'page_obj': page_obj,
+        'query': query,
+    })
 
 
 @login_required
@@ -149,6 +195,50 @@ def student_delete(request, pk):
     return render(request, 'attendance/student_confirm_delete.html', {'student': student})
 
 
+@login_required
+def student_photo_thumbnail(request, digest, size, ext):
+    """
+    Serve a cached photo thumbnail. The URL carries the photo's content hash,
+    so the response never changes and browsers may keep it for a year.
+    """
+    if size not in THUMBNAIL_SIZES or ext not in THUMBNAIL_FORMATS:
+        raise Http404('Unknown thumbnail')
+
+    path = thumbnail_path(digest, size, ext)
+    if not os.path.exists(path):
+        # Cache cleared or worker not done yet: render it now for the student it belongs to
+        student = Student.objects.filter(photo_hash=digest).first()
+        if student is None or generate_thumbnails(student) != digest:
+            raise Http404('Unknown thumbnail')
+
+    response = FileResponse(open(path, 'rb'), content_type=THUMBNAIL_FORMATS[ext][1])
+    patch_cache_control(response, private=True, max_age=THUMBNAIL_CACHE_SECONDS, immutable=True)
+    return response
+
+
+def _submitted_register(post):
+    """
+    {student_id: status} from a register POST. mark_attendance.js sends the
+    whole register as one JSON 'register' field, so rosters of any size stay
+    under DATA_UPLOAD_MAX_NUMBER_FIELDS; without JavaScript the form posts
+    one attendance-<student_id> field per student instead. Returns None for
+    a malformed 'register' field.
+    """
+    encoded = post.get('register')
+    if encoded:
+        try:
+            register = json.loads(encoded)
+        except ValueError:
+            return None
+        return register if isinstance(register, dict) else None
+
+    # key format: attendance-<student_id>
+    return {
+        key.split('-', 1)[1]: status
+        for key, status in post.items() if key.startswith('attendance-')
+    }
+
+
 @login_required
 def mark_attendance(request):
     """
@@ -167,68 +257,50 @@ def mark_attendance(request):
     teacher = request.user.teacher
 
     if request.method == 'POST':
-        # Expect POST data in form: attendance-<student_id> = 'present'/'absent'/'late'
-        submitted = {k: v for k, v in request.POST.items() if k.startswith('attendance-')}
+        register = _submitted_register(request.POST)
 
-        if not submitted:
+        if not register:
             messages.error(request, 'No attendance data submitted.')
             return redirect('mark_attendance')
 
-        success_count = 0
-        for key, status in submitted.items():
-            # key format: attendance-<student_id>
-            try:
-                _, student_id = key.split('-', 1)
-                # If Student.student_id is numeric string in your model, ensure matching type; here
-                # we assume the field is unique and can be matched by whatever type stored.
-                student = Student.objects.get(student_id=student_id, is_active=True)
-            except (ValueError, Student.DoesNotExist):
-                logger.warning(f"Invalid attendance key or student not found: {key}")
-                continue
-
-            # Create or update attendance for today
-            attendance_values = {
-                'status': status,
-                'marked_by': teacher,
-            }
+        outcomes = save_register(register, today, teacher)
 
-            local_time = timezone.localtime(timezone.now()).time()
-
-            if status == 'present':
-                attendance_values['time_in'] = local_time
-            else:
-                attendance_values['time_in'] = None
-
-            Attendance.objects.update_or_create(
-                student=student,
-                date=today,
-                defaults=attendance_values
-            )
-            success_count += 1
+        skipped = [student_id for student_id, outcome in outcomes.items() if outcome in (NOT_FOUND, INVALID_STATUS)]
+        for student_id in skipped:
+            logger.warning(f"Attendance not saved for {student_id}: {outcomes[student_id]}")
 
+        success_count = len(outcomes) - len(skipped)
         messages.success(request, f'Attendance updated for {success_count} students for {today}')
         return redirect('dashboard')
 
     else:
-        students = Student.objects.filter(is_active=True).order_by('name')
-
-        # Prefill existing attendance for today so radios can be pre-selected in template
-        existing_attendance = Attendance.objects.filter(date=today)
-        # Map by student_id (ensure keys match the same type you use in templates)
-        existing_map = {a.student.student_id: a for a in existing_attendance}
-
-        student_rows = []
-        for s in students:
-            a = existing_map.get(s.student_id)
-            student_rows.append({
-                'student': s,
-                'status': a.status if a else 'absent'  # default to absent
-            })
-
-        return render(request, 'attendance/mark_attendance.html', {
-            'students': student_rows,
-            'current_date': today
-        })
+        # Prefill today's statuses keyed on the student FK so radios can be pre-selected
+        existing_map = dict(register_prefill_query(today))
+
+        head, tail = render_to_string('attendance/mark_attendance.html', {
+            'current_date': today,
+        }, request=request).split(REGISTER_ROWS_MARKER, 1)
+
+        students = active_students_query().only('pk', 'student_id', 'name')
+
+        def register_rows():
+            # Stream the register in chunks so large rosters start rendering immediately
+            yield head
+            chunk = []
+            for number, s in enumerate(students.iterator(chunk_size=REGISTER_CHUNK_SIZE), start=1):
+                chunk.append({
+                    'number': number,
+                    'student': s,
+                    'status': existing_map.get(s.pk, 'absent')  # default to absent
+                })
+                if len(chunk) == REGISTER_CHUNK_SIZE:
+                    yield render_to_string('attendance/_register_rows.html', {'rows': chunk})
+                    chunk = []
+            if chunk:
+                yield render_to_string('attendance/_register_rows.html', {'rows': chunk})
+            yield tail
+
+        return StreamingHttpResponse(register_rows(), content_type='text/html; charset=utf-8')
 
 
 @login_required
@@ -247,7 +319,7 @@ def holiday_management(request):
     else:
         form = HolidayForm()
 
-    holidays = Holiday.objects.all().order_by('-date')
+    holidays = Holiday.objects.select_related('created_by').order_by('-date')
     return render(request, 'attendance/holiday_management.html', {
         'form': form,
         'holidays': holidays
@@ -283,7 +355,6 @@ def parse_date_safe(date_str, fallback):
 @login_required
 def attendance_report(request):
     """Generate attendance reports (defaults to current date when no filters provided)."""
-    students = Student.objects.filter(is_active=True)
     today = timezone.now().date()
 
     # Parse GET parameters safely
@@ -297,41 +368,20 @@ def attendance_report(request):
     if end_date < start_date:
         end_date = start_date
 
-    # Fetch holidays in range
-    holidays = Holiday.objects.filter(date__range=[start_date, end_date])
-    holiday_dates = set(h.date for h in holidays)
-
-    # Count working days (Mon–Fri excluding holidays)
-    total_working_days = 0
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() < 5 and current_date not in holiday_dates:
-            total_working_days += 1
-        current_date += timedelta(days=1)
-
-    # Build report
-    report_data = []
-    for student in students:
-        present_days = Attendance.objects.filter(
-            student=student,
-            date__range=[start_date, end_date],
-            status='present'
-        ).count()
-
-        absent_days = total_working_days - present_days
-
-        attendance_percentage = (
-            (present_days / total_working_days) * 100
-            if total_working_days > 0 else 0.0
-        )
-
-        report_data.append({
-            'student': student,
-            'present_days': present_days,
-            'absent_days': absent_days,
-            'total_working_days': total_working_days,
-            'attendance_percentage': round(attendance_percentage, 1)
-        })
+    holidays = get_working_day_calendar().holidays_between(start_date, end_date)
+
+    analytics = None
+    if matrix_engine_enabled():
+        # One matrix serves both the per-student rows and the class-wide figures
+        matrix = AttendanceMatrix.load(start_date, end_date)
+        report_data, total_working_days = report_from_matrix(matrix)
+        analytics = {
+            'summary': matrix.summary(),
+            'weekday_rates': matrix.weekday_rates(),
+            'distribution': matrix.percentage_distribution(),
+        }
+    else:
+        report_data, total_working_days = build_attendance_report(start_date, end_date)
 
     context = {
         'report_data': report_data,
@@ -339,11 +389,53 @@ def attendance_report(request):
         'end_date': end_date,
         'total_working_days': total_working_days,
         'holidays': holidays,
+        'analytics': analytics,
     }
 
     return render(request, 'attendance/attendance_report.html', context)
 
 
+@login_required
+def absence_report(request):
+    """Students on an absence streak or below the chronic-absence threshold, as of a date."""
+    today = timezone.now().date()
+    as_of = parse_date_safe(request.GET.get('date', ''), today)
+
+    report = AbsenceReport.for_date(as_of)
+    paginator = Paginator(report.rows(), STUDENTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'attendance/absence_report.html', {
+        'rows': page_obj,
+        'page_obj': page_obj,
+        'as_of': as_of,
+        'counts': report.counts(),
+        'threshold': report.threshold,
+        'streak_alert': report.streak_alert,
+        'rolling_days': report.rolling_days,
+        'start_date': report.matrix.start_date,
+    })
+
+
+@login_required
+def export_attendance(request):
+    """Stream attendance as CSV or NDJSON, filtered by date range and student IDs."""
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'success': False, 'error': f'Unsupported format: {export_format}'}, status=400)
+
+    queryset = filter_export_queryset(
+        start_date=parse_date_safe(request.GET.get('start_date', ''), None),
+        end_date=parse_date_safe(request.GET.get('end_date', ''), None),
+        student_ids=request.GET.getlist('student_id'),
+    )
+
+    generate, content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(generate(queryset), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename=attendance_export.{extension}'
+    return response
+
+
 @login_required
 def teacher_logout(request):
     """Logout view"""
@@ -356,7 +448,7 @@ def teacher_logout(request):
 def get_student_attendance_data(request, student_id):
     """Get attendance data for a specific student"""
     try:
-        student = Student.objects.get(student_id=student_id)
+        student = Student.objects.only('pk', 'name').get(student_id=student_id)
 
         today = timezone.now().date()
         start_date = today - timedelta(days=30)
@@ -364,14 +456,14 @@ def get_student_attendance_data(request, student_id):
         attendance_records = Attendance.objects.filter(
             student=student,
             date__range=[start_date, today]
-        ).order_by('date')
+        ).order_by('date').values_list('date', 'status', 'time_in')
 
         data = []
-        for record in attendance_records:
+        for date, status, time_in in attendance_records:
             data.append({
-                'date': record.date.strftime('%Y-%m-%d'),
-                'status': record.status,
-                'time_in': record.time_in.strftime('%H:%M') if record.time_in else None,
+                'date': date.strftime('%Y-%m-%d'),
+                'status': status,
+                'time_in': time_in.strftime('%H:%M') if time_in else None,
             })
 
         return JsonResponse({
@@ -387,6 +479,236 @@ def get_student_attendance_data(request, student_id):
         })
 
 
+@login_required
+def batch_attendance_data(request):
+    """
+    Attendance for many students over a date range, as compact columnar JSON.
+
+    Query parameters: student_id (repeatable or comma-separated), start_date,
+    end_date (default: last 30 days), cursor (student_id to continue after)
+    and limit. Each student gets parallel `dates` and `statuses` arrays using
+    the single-letter codes in `status_codes`. Responses carry an ETag over
+    the page's students and the latest attendance write, plus that write's
+    Last-Modified, so unchanged data returns 304.
+    """
+    today = timezone.now().date()
+    end_date = parse_date_safe(request.GET.get('end_date', ''), today)
+    start_date = parse_date_safe(request.GET.get('start_date', ''), end_date - timedelta(days=30))
+    if end_date < start_date:
+        return JsonResponse({'success': False, 'error': 'end_date is before start_date'}, status=400)
+
+    student_ids = sorted({
+        value.strip()
+        for param in request.GET.getlist('student_id')
+        for value in param.split(',')
+        if value.strip()
+    })
+    if not student_ids:
+        return JsonResponse({'success': False, 'error': 'At least one student_id is required'}, status=400)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', API_PAGE_SIZE)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        limit = API_PAGE_SIZE
+
+    cursor = request.GET.get('cursor', '')
+    students = Student.objects.filter(student_id__in=student_ids)
+    if cursor:
+        students = students.filter(student_id__gt=cursor)
+    page = list(students.order_by('student_id').values_list('pk', 'student_id', 'name')[:limit + 1])
+    next_cursor = page[limit - 1][1] if len(page) > limit else None
+    page = page[:limit]
+
+    records = Attendance.objects.filter(
+        student_id__in=[pk for pk, _, _ in page],
+        date__range=[start_date, end_date],
+    )
+
+    # Version the response on the newest write (and row count, to catch deletes);
+    # the page's student IDs and names are hashed in too, since renames don't touch attendance
+    version = records.aggregate(last_modified=Max('updated_timestamp'), rows=Count('id'))
+    last_modified = version['last_modified']
+    etag = hashlib.md5(
+        f"{page}|{start_date}|{end_date}|{next_cursor}|"
+        f"{last_modified}|{version['rows']}".encode()
+    ).hexdigest()
+
+    not_modified = get_conditional_response(
+        request,
+        etag=f'"{etag}"',
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = f'attendance:batch-api:{etag}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        columns = {pk: {'student_id': sid, 'name': name, 'dates': [], 'statuses': []} for pk, sid, name in page}
+        for pk, date, status in records.order_by('student_id', 'date').values_list('student_id', 'date', 'status'):
+            columns[pk]['dates'].append(date.isoformat())
+            columns[pk]['statuses'].append(API_STATUS_CODES[status])
+
+        payload = {
+            'success': True,
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
+            'status_codes': {code: status for status, code in API_STATUS_CODES.items()},
+            'students': list(columns.values()),
+            'next_cursor': next_cursor,
+        }
+        cache.set(cache_key, payload, API_CACHE_TIMEOUT)
+
+    response = JsonResponse(payload)
+    response['ETag'] = f'"{etag}"'
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def metrics(request):
+    """Prometheus text exposition of the per-view instrumentation totals."""
+    if not settings.ATTENDANCE_INSTRUMENTATION:
+        raise Http404('Instrumentation is disabled')
+    if request.META.get('REMOTE_ADDR') not in settings.ATTENDANCE_METRICS_ALLOWED_IPS:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(view_metrics.render(), content_type='text/plain; version=0.0.4')
+
+
+def _parse_marks(payload):
+    """Accept a single mark or {"marks": [...]}; returns a list of mark dicts or None."""
+    if isinstance(payload, dict) and 'marks' in payload:
+        payload = payload['marks']
+    elif isinstance(payload, dict):
+        payload = [payload]
+    if not isinstance(payload, list) or not all(isinstance(mark, dict) for mark in payload):
+        return None
+    return payload
+
+
+def _queue_marks(register, teacher_id, attendance_date):
+    """Journal marks in the write-behind buffer; the journal write (and fsync) blocks."""
+    buffer = get_write_buffer()
+    outcomes = {}
+    for student_id, status in register.items():
+        if status in VALID_STATUSES:
+            buffer.submit(student_id, status, teacher_id, attendance_date)
+            outcomes[student_id] = QUEUED
+        else:
+            outcomes[student_id] = INVALID_STATUS
+    return outcomes
+
+
+@login_required
+async def attendance_api(request):
+    """
+    Async JSON endpoint for kiosks and mobile check-in.
+
+    POST {"student_id": "ST001", "status": "present"} or
+    {"date": "YYYY-MM-DD", "marks": [{"student_id": ..., "status": ...}, ...]}
+    saves marks (default date: today) and returns an outcome per student.
+    With ATTENDANCE_WRITE_BEHIND enabled, marks are journaled and acknowledged
+    with 202 / "queued", then written in batches by the write-behind buffer.
+    GET ?date=YYYY-MM-DD&student_id=... returns that day's marks.
+    """
+    today = timezone.now().date()
+
+    if request.method == 'GET':
+        attendance_date = parse_date_safe(request.GET.get('date', ''), today)
+        records = Attendance.objects.filter(date=attendance_date)
+        student_ids = request.GET.getlist('student_id')
+        if student_ids:
+            records = records.filter(student__student_id__in=student_ids)
+
+        marks = [
+            {'student_id': student_id, 'status': status, 'time_in': time_in.strftime('%H:%M') if time_in else None}
+            async for student_id, status, time_in in records.order_by('student__student_id').values_list(
+                'student__student_id', 'status', 'time_in'
+            )
+        ]
+        return JsonResponse({'success': True, 'date': attendance_date.isoformat(), 'marks': marks})
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+
+    teacher = await aget_teacher(await request.auser())
+    if teacher is None:
+        return JsonResponse({'success': False, 'error': 'You are not authorized to mark attendance.'}, status=403)
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Request body must be JSON'}, status=400)
+
+    marks = _parse_marks(payload)
+    if not marks:
+        return JsonResponse({'success': False, 'error': 'No attendance marks submitted'}, status=400)
+
+    if not all(isinstance(mark.get('student_id'), str) and isinstance(mark.get('status'), str) for mark in marks):
+        return JsonResponse({'success': False, 'error': 'Each mark needs a string student_id and status'}, status=400)
+
+    attendance_date = today
+    if isinstance(payload, dict) and payload.get('date'):
+        attendance_date = parse_date_safe(payload['date'], None) if isinstance(payload['date'], str) else None
+        if attendance_date is None:
+            return JsonResponse({'success': False, 'error': 'date must be YYYY-MM-DD'}, status=400)
+
+    register = {mark['student_id']: mark['status'] for mark in marks}
+
+    if settings.ATTENDANCE_WRITE_BEHIND:
+        # Journal and acknowledge now; the buffer writes the batch shortly after
+        outcomes = await sync_to_async(_queue_marks)(register, teacher.pk, attendance_date)
+        return JsonResponse({
+            'success': True,
+            'date': attendance_date.isoformat(),
+            'results': outcomes,
+        }, status=202)
+
+    outcomes = await sync_to_async(save_register)(register, attendance_date, teacher)
+
+    return JsonResponse({
+        'success': True,
+        'date': attendance_date.isoformat(),
+        'results': outcomes,
+    })
+
+
+@login_required
+def face_checkin(request):
+    """
+    Photo check-in: POST a picture as the `image` file. Every face found is
+    matched against the face index and matched students are marked present
+    for today; returns the number of faces and an outcome per matched student.
+    """
+    if not settings.FACE_CHECKIN:
+        raise Http404('Photo check-in is disabled')
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Method not allowed'}, status=405)
+    if not hasattr(request.user, 'teacher'):
+        return JsonResponse({'success': False, 'error': 'You are not authorized to mark attendance.'}, status=403)
+
+    upload = request.FILES.get('image')
+    if upload is None:
+        return JsonResponse({'success': False, 'error': 'Send the picture as the "image" file'}, status=400)
+    try:
+        image = load_image(upload)
+    except UNREADABLE_IMAGE_ERRORS:
+        return JsonResponse({'success': False, 'error': 'image is not a readable picture'}, status=400)
+
+    index = get_face_index()
+    if index is None:
+        return JsonResponse({'success': False, 'error': 'The face index has not been built yet'}, status=503)
+
+    today = timezone.now().date()
+    faces, results = check_in_faces(image, request.user.teacher, index, attendance_date=today)
+    return JsonResponse({
+        'success': True,
+        'date': today.isoformat(),
+        'faces': faces,
+        'results': results,
+    })
+
+
 # @login_required
 # def manual_attendance(request):
 #     """
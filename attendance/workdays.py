@@ -0,0 +1,145 @@
+# attendance/workdays.py
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Holiday
+
+CALENDAR_VERSION_KEY = 'attendance:working-day-calendar:version'
+
+_lock = threading.Lock()
+_calendar = None
+_calendar_version = None
+_calendar_loaded_at = 0.0
+
+
+def _weekdays_before(day):
+    """Number of Mon-Fri dates strictly before `day`, counted from date.min."""
+    ordinal = day.toordinal() - 1  # date(1, 1, 1) is a Monday
+    weeks, remainder = divmod(ordinal, 7)
+    return weeks * 5 + min(remainder, 5)
+
+
+class WorkingDayCalendar:
+    """
+    Immutable view of the school calendar: Mon-Fri minus every Holiday.
+
+    Holidays are held as sorted arrays, and a weekday holiday's index in its
+    array is the prefix sum of weekday holidays before it, so every range
+    question is answered with arithmetic plus a binary search rather than by
+    walking dates.
+    """
+
+    def __init__(self, holidays):
+        holidays = sorted(holidays)
+        self.holiday_dates = [day for day, _ in holidays]
+        self.descriptions = dict(holidays)
+        # Weekend holidays don't change the working-day count
+        self.weekday_holidays = [day for day in self.holiday_dates if day.weekday() < 5]
+
+    @classmethod
+    def load(cls):
+        return cls(Holiday.objects.values_list('date', 'description'))
+
+    def is_holiday(self, day):
+        return day in self.descriptions
+
+    def is_working_day(self, day):
+        return day.weekday() < 5 and day not in self.descriptions
+
+    def working_days_between(self, start_date, end_date):
+        """Number of working days in [start_date, end_date] (inclusive)."""
+        if end_date < start_date:
+            return 0
+        weekdays = _weekdays_before(end_date + timedelta(days=1)) - _weekdays_before(start_date)
+        holidays = (
+            bisect_right(self.weekday_holidays, end_date) - bisect_left(self.weekday_holidays, start_date)
+        )
+        return weekdays - holidays
+
+    def nth_working_day(self, start_date, n):
+        """
+        The n-th working day on or after start_date (n=1 is the first).
+        Binary search over the monotonic working_days_between count.
+        """
+        if n < 1:
+            raise ValueError('n must be at least 1')
+        low = start_date
+        # Any 7 consecutive days hold 5 weekdays, and each holiday costs at most one
+        high = start_date + timedelta(days=((n + len(self.weekday_holidays)) // 5 + 1) * 7)
+        while low < high:
+            middle = low + (high - low) // 2
+            if self.working_days_between(start_date, middle) >= n:
+                high = middle
+            else:
+                low = middle + timedelta(days=1)
+        return low
+
+    def working_days(self, start_date, end_date):
+        """The working dates in [start_date, end_date], for callers that need the dates themselves."""
+        holidays = set(self.holidays_between(start_date, end_date))
+        days = (start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1))
+        return [day for day in days if day.weekday() < 5 and day not in holidays]
+
+    def holidays_between(self, start_date, end_date):
+        """Holiday dates in [start_date, end_date], in order."""
+        return self.holiday_dates[
+            bisect_left(self.holiday_dates, start_date):bisect_right(self.holiday_dates, end_date)
+        ]
+
+    def upcoming_holidays(self, today, limit=None):
+        """(date, description) for holidays from today on, soonest first."""
+        upcoming = self.holiday_dates[bisect_left(self.holiday_dates, today):]
+        if limit is not None:
+            upcoming = upcoming[:limit]
+        return [(day, self.descriptions[day]) for day in upcoming]
+
+
+def _calendar_is_current(version):
+    max_age = getattr(settings, 'WORKING_DAY_CALENDAR_MAX_AGE', 60)
+    return (
+        _calendar is not None
+        and version == _calendar_version
+        and time.monotonic() - _calendar_loaded_at < max_age
+    )
+
+
+def get_working_day_calendar():
+    """
+    The process-wide calendar, loaded from the database once and reused until a
+    Holiday changes. Other processes notice the change through a version number
+    kept in the cache, which only reaches them when the cache is shared
+    (Redis, Memcached); the calendar is also reloaded every
+    WORKING_DAY_CALENDAR_MAX_AGE seconds so workers with a per-process cache
+    catch up on their own.
+    """
+    global _calendar, _calendar_version, _calendar_loaded_at
+
+    version = cache.get(CALENDAR_VERSION_KEY)
+    calendar = _calendar
+    if _calendar_is_current(version):
+        return calendar
+
+    with _lock:
+        if not _calendar_is_current(version):
+            _calendar = WorkingDayCalendar.load()
+            _calendar_version = version
+            _calendar_loaded_at = time.monotonic()
+        return _calendar
+
+
+def invalidate_working_day_calendar():
+    """Drop this process's calendar and tell other processes to reload theirs."""
+    global _calendar
+
+    with _lock:
+        _calendar = None
+    try:
+        cache.incr(CALENDAR_VERSION_KEY)
+    except ValueError:
+        cache.set(CALENDAR_VERSION_KEY, 1, None)
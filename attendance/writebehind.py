@@ -0,0 +1,352 @@
+# attendance/writebehind.py
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, see _try_lock
+    fcntl = None
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .marking import save_register, VALID_STATUSES, NOT_FOUND
+from .models import Teacher
+
+logger = logging.getLogger(__name__)
+
+# Every buffer owns its files: journal-<owner>.log, rotated journal-<owner>.<ns>.flushing
+# segments and journal-<owner>.lock, which it holds locked for as long as it runs
+JOURNAL_PREFIX = 'journal-'
+RECOVERY_LOCK = 'recovery.lock'
+
+
+def _try_lock(file):
+    """Lock an open file exclusively without waiting; False if another process holds it."""
+    if fcntl is None:
+        # Liveness cannot be told without locks; other journals are left to
+        # `manage.py flush_attendance_journal --force` with every worker stopped
+        return False
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _journal_owner(name):
+    """The owner part of a journal file name; None for the single journal.log of older versions."""
+    if not name.startswith(JOURNAL_PREFIX):
+        return None
+    return name[len(JOURNAL_PREFIX):].split('.', 1)[0]
+
+
+class AttendanceWriteBuffer:
+    """
+    In-process write-behind buffer for high-rate attendance marks.
+
+    submit() appends the mark to an append-only journal and keeps the latest
+    mark per (student, date) in memory. A background thread flushes pending
+    marks through save_register every `flush_interval` seconds, or sooner once
+    `max_records` are waiting. Each flush rotates the journal first and deletes
+    the rotated segment only after the database write succeeds, so marks that
+    were journaled but not written are replayed after a crash.
+
+    Each buffer (one per worker process) writes only its own journal files and
+    holds a lock on them while it runs. recover() replays the journals whose
+    lock is free, i.e. whose process has exited, never those of live workers.
+    """
+
+    def __init__(self, journal_dir, flush_interval=0.2, max_records=500, fsync=False):
+        self.journal_dir = str(journal_dir)
+        self.flush_interval = flush_interval
+        self.max_records = max_records
+        self.fsync = fsync
+        self.owner = f'{os.getpid()}-{time.time_ns()}'
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._journal = None
+        self._owner_lock = None
+        self._thread = None
+
+    # Journal ------------------------------------------------------------
+
+    def _path(self, suffix, owner=None):
+        return os.path.join(self.journal_dir, f'{JOURNAL_PREFIX}{owner or self.owner}{suffix}')
+
+    def _journal_path(self):
+        return self._path('.log')
+
+    def _open_journal(self):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._journal = open(self._journal_path(), 'a', encoding='utf-8')
+
+    def _append(self, entry):
+        self._journal.write(json.dumps(entry) + '\n')
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+
+    def _rotate(self):
+        """Move the live journal aside; caller holds self._lock."""
+        self._journal.close()
+        segment = self._path(f'.{time.time_ns()}.flushing')
+        os.replace(self._journal_path(), segment)
+        self._open_journal()
+        return segment
+
+    @staticmethod
+    def _read_segment(path):
+        entries = []
+        with open(path, encoding='utf-8') as segment:
+            for line in segment:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # A torn final line from a crash mid-write; everything before it is intact
+                    logger.warning(f"Skipping unreadable journal line in {path}")
+        return entries
+
+    # Lifecycle ----------------------------------------------------------
+
+    @contextmanager
+    def _recovery_lock(self):
+        """Serialise recovery between processes starting at the same time."""
+        with open(os.path.join(self.journal_dir, RECOVERY_LOCK), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _claim(self, owner, force):
+        """
+        Take over a dead owner's journal: returns its open, locked lock file,
+        None if it has no lock file (older versions, or a clean shutdown in
+        progress), or False while its process still holds the lock.
+        """
+        try:
+            lock = open(self._path('.lock', owner))
+        except FileNotFoundError:
+            return None
+        if _try_lock(lock) or force:
+            return lock
+        lock.close()
+        return False
+
+    def recover(self, force=False):
+        """
+        Replay and delete the journals of buffers whose process has exited.
+        With force, replay every other journal too; only safe with every
+        worker stopped. Returns the number of marks replayed.
+        """
+        os.makedirs(self.journal_dir, exist_ok=True)
+        with self._recovery_lock():
+            owned = defaultdict(list)
+            for name in os.listdir(self.journal_dir):
+                owner = _journal_owner(name)
+                if owner == self.owner:
+                    continue
+                if name.endswith(('.log', '.flushing')):
+                    owned[owner].append(name)
+                elif name.endswith('.lock') and owner is not None:
+                    # A worker that crashed before journaling leaves only its lock file
+                    owned.setdefault(owner, [])
+
+            # The older single journal.log first, then owners in the order they started
+            owners = sorted(owned, key=lambda owner: (owner is not None, owner and owner.split('-')[-1]))
+            replay, claimed = {}, []
+            try:
+                for owner in owners:
+                    lock = self._claim(owner, force) if owner is not None else None
+                    if lock is False:
+                        continue
+                    # Rotated segments in rotation order, then the live journal
+                    names = sorted(owned[owner], key=lambda name: (name.endswith('.log'), len(name), name))
+                    paths = [os.path.join(self.journal_dir, name) for name in names]
+                    claimed.append((owner, paths, lock))
+                    for path in paths:
+                        try:
+                            entries = self._read_segment(path)
+                        except FileNotFoundError:
+                            continue
+                        for entry in entries:
+                            replay[(entry['student_id'], entry['date'])] = entry
+
+                if replay:
+                    logger.info(f"Replaying {len(replay)} journaled attendance mark(s)")
+                    self._write(replay)
+                for owner, paths, lock in claimed:
+                    for path in paths + ([self._path('.lock', owner)] if lock is not None else []):
+                        try:
+                            os.remove(path)
+                        except FileNotFoundError:
+                            pass
+            finally:
+                for _, _, lock in claimed:
+                    if lock is not None:
+                        lock.close()
+            return len(replay)
+
+    def start(self):
+        """Lock this buffer's journal, replay journals left by dead workers, then start the flusher thread."""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        if fcntl is None:
+            self._owner_lock = open(self._path('.lock'), 'a')
+        else:
+            # Lock before the name appears, so recovering processes never see it unlocked
+            partial = self._path('.lock.tmp')
+            self._owner_lock = open(partial, 'a')
+            _try_lock(self._owner_lock)
+            os.replace(partial, self._path('.lock'))
+
+        self.recover()
+
+        self._open_journal()
+        self._thread = threading.Thread(target=self._run, name='attendance-write-behind', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Flush whatever is pending and stop the flusher thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        try:
+            self.flush()
+        finally:
+            self._journal.close()
+            written = not self._pending
+            if written:
+                # Everything is written; a failed flush leaves the journal for recovery
+                os.remove(self._journal_path())
+            self._owner_lock.close()
+            if written:
+                try:
+                    os.remove(self._path('.lock'))
+                except FileNotFoundError:
+                    pass  # already cleared by a recovering worker
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Attendance write-behind flush failed")
+            finally:
+                close_old_connections()
+
+    # Public API ---------------------------------------------------------
+
+    def submit(self, student_id, status, teacher_id, attendance_date=None, marked_at=None):
+        """Accept one mark; returns immediately once it is journaled."""
+        if not isinstance(status, str) or status not in VALID_STATUSES:
+            raise ValueError(f'Invalid attendance status: {status}')
+
+        marked_at = marked_at or timezone.localtime(timezone.now())
+        entry = {
+            'student_id': str(student_id),
+            'status': status,
+            'teacher_id': teacher_id,
+            'date': (attendance_date or marked_at.date()).isoformat(),
+            'time': marked_at.time().isoformat(),
+        }
+
+        with self._lock:
+            self._append(entry)
+            self._pending[(entry['student_id'], entry['date'])] = entry
+            if len(self._pending) >= self.max_records:
+                self._wake.set()
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self):
+        """Write pending marks now; returns the number of marks flushed."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, {}
+                segment = self._rotate()
+
+            try:
+                self._write(batch)
+            except Exception:
+                # Put the batch back (newer marks win) and re-journal it so the
+                # rotated segment can go without replaying stale marks later.
+                with self._lock:
+                    for key, entry in batch.items():
+                        if key not in self._pending:
+                            self._pending[key] = entry
+                            self._append(entry)
+                os.remove(segment)
+                raise
+
+            os.remove(segment)
+            return len(batch)
+
+    # Database -----------------------------------------------------------
+
+    @staticmethod
+    def _write(batch):
+        """Upsert coalesced marks, one save_register call per (date, teacher)."""
+        groups = defaultdict(dict)
+        for entry in batch.values():
+            groups[(entry['date'], entry['teacher_id'])][entry['student_id']] = entry
+
+        teachers = Teacher.objects.in_bulk({teacher_id for _, teacher_id in groups})
+        for (day, teacher_id), entries in groups.items():
+            teacher = teachers.get(teacher_id)
+            if teacher is None:
+                logger.warning(f"Dropping {len(entries)} mark(s) from unknown teacher {teacher_id}")
+                continue
+
+            outcomes = save_register(
+                {student_id: entry['status'] for student_id, entry in entries.items()},
+                date.fromisoformat(day),
+                teacher,
+                marked_times={
+                    student_id: datetime.fromisoformat(f"{day}T{entry['time']}").time()
+                    for student_id, entry in entries.items()
+                },
+            )
+            for student_id, outcome in outcomes.items():
+                if outcome == NOT_FOUND:
+                    logger.warning(f"Write-behind mark dropped, student not found: {student_id}")
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_buffer():
+    """The process-wide buffer, started (and its journal replayed) on first use."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = AttendanceWriteBuffer(
+                settings.ATTENDANCE_WRITE_BEHIND_JOURNAL,
+                flush_interval=settings.ATTENDANCE_WRITE_BEHIND_INTERVAL_MS / 1000,
+                max_records=settings.ATTENDANCE_WRITE_BEHIND_MAX_RECORDS,
+                fsync=settings.ATTENDANCE_WRITE_BEHIND_FSYNC,
+            )
+            _buffer.start()
+            atexit.register(_buffer.stop)
+        return _buffer
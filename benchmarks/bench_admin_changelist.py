@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Time the Attendance admin changelist on a large table, with the tuned
+AttendanceAdmin and with the stock options it replaced (full COUNT(*),
+option-list filters, icontains search, DISTINCT date hierarchy).
+
+    python benchmarks/bench_admin_changelist.py --database /tmp/bench.db --students 40000 --years 1
+
+The database file is filled with `generate_synthetic_data` on first use and
+reused afterwards, so the expensive seeding happens once.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django
+
+
+def stock_admin():
+    from django.contrib import admin
+    from attendance.admin import AttendanceAdmin
+
+    class StockAttendanceAdmin(admin.ModelAdmin):
+        list_display = AttendanceAdmin.list_display
+        list_filter = ['status', 'date', 'marked_by']
+        search_fields = ['student__name', 'student__student_id']
+        date_hierarchy = 'date'
+        list_select_related = ('student', 'marked_by')
+        ordering = ['-date', 'student__student_id']
+
+    return StockAttendanceAdmin
+
+
+def use_admin(admin_class):
+    import importlib
+    from django.conf import settings
+    from django.contrib import admin
+    from django.urls import clear_url_caches
+    from attendance.models import Attendance
+
+    admin.site.unregister(Attendance)
+    admin.site.register(Attendance, admin_class)
+    # The admin URLs hold on to the ModelAdmin instance, so rebuild them
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+def scenarios():
+    from attendance.models import Attendance, Student, Teacher
+
+    latest = Attendance.objects.order_by('-date').values_list('date', flat=True).first()
+    student = Student.objects.order_by('pk').first()
+    teacher = Teacher.objects.order_by('pk').first()
+    return [
+        ('unfiltered', ''),
+        ('status=absent', 'status__exact=absent'),
+        ('student filter', f'student__id__exact={student.pk}'),
+        ('teacher filter', f'marked_by__id__exact={teacher.pk}'),
+        ('search student_id prefix', f'q={student.student_id[:-2]}'),
+        ('date hierarchy: year', f'date__year={latest.year}'),
+        ('date hierarchy: month', f'date__year={latest.year}&date__month={latest.month}'),
+        ('page 50', 'p=50'),
+    ]
+
+
+def time_changelist(client, query, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings, queries = [], 0
+    for attempt in range(repeat + 1):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(f'/admin/attendance/attendance/?{query}')
+            elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.status_code
+        if attempt:  # the first request warms caches
+            timings.append(elapsed * 1000)
+        queries = len(captured.captured_queries)
+    return statistics.median(timings), queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', default='/tmp/attendance_admin_bench.sqlite3')
+    parser.add_argument('--students', type=int, default=40000)
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--skip-stock', action='store_true', help='Only time the tuned admin')
+    args = parser.parse_args()
+
+    setup_benchmark_django({'ENGINE': 'django.db.backends.sqlite3', 'NAME': args.database})
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import Client
+    from attendance.admin import AttendanceAdmin
+    from attendance.models import Attendance
+
+    settings.ALLOWED_HOSTS = ['*']
+    if not Attendance.objects.exists():
+        print(f'Generating {args.students} students x {args.years} year(s) into {args.database}...')
+        call_command('generate_synthetic_data', students=args.students, years=args.years)
+        # Planner statistics, which PostgreSQL's autovacuum would keep for us
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    user = User.objects.filter(username='bench-admin').first()
+    if user is None:
+        user = User.objects.create_superuser('bench-admin', 'bench@example.com', 'bench')
+    client = Client()
+    client.force_login(user)
+
+    print(f'{Attendance.objects.count():,} attendance rows')
+    variants = [('tuned', AttendanceAdmin)] + ([] if args.skip_stock else [('stock', stock_admin())])
+    results = {}
+    for label, admin_class in variants:
+        use_admin(admin_class)
+        for name, query in scenarios():
+            results[(label, name)] = time_changelist(client, query, args.repeat)
+
+    print(f"\n{'scenario':<28}" + ''.join(f'{label:>22}' for label, _ in variants))
+    for name, _ in scenarios():
+        cells = ''.join(
+            f"{results[(label, name)][0]:>12.1f} ms {results[(label, name)][1]:>3} q" for label, _ in variants
+        )
+        print(f'{name:<28}{cells}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Compare the NumPy attendance matrix with the ORM paths for the report and
+dashboard statistics.
+
+    python benchmarks/bench_analytics.py --students 10000 --days 200
+
+Timed per engine:
+  * report: per-student present/late/absent over the range
+      - per-student loop: one COUNT query per student (the original report)
+      - set-based ORM: build_attendance_report's grouped range query
+      - matrix: AttendanceMatrix.load + student_counts
+  * per-day totals over the range
+      - per-day loop: one COUNT query per day (the original dashboard chart)
+      - matrix: daily_totals on the already loaded matrix
+  * weekday pattern and percentage distribution (matrix only; no ORM equivalent)
+  * absence streaks, rolling 30-day rates and chronic flags (AbsenceReport on the loaded matrix)
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django
+
+
+def seed(students, days):
+    from django.core.management import call_command
+    from django.db import connection
+
+    call_command(
+        'generate_synthetic_data', students=students, years=days / 365, holidays_per_year=15,
+        verbosity=0, stdout=open(os.devnull, 'w'),
+    )
+    # Without statistics SQLite serves the per-student counts from the status index
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def best_of(repeat, function):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=200, help='Calendar days of attendance ending today')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--database', default=None, help='SQLite file to reuse between runs')
+    args = parser.parse_args()
+
+    database = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': args.database} if args.database else None
+    setup_benchmark_django(database)
+
+    from attendance.absences import AbsenceReport
+    from attendance.analytics import AttendanceMatrix
+    from attendance.models import Attendance, Student
+    from attendance.reports import build_attendance_report
+
+    if not Attendance.objects.exists():
+        print(f'Seeding {args.students} students x {args.days} days...')
+        seed(args.students, args.days)
+
+    end = date.today()
+    start = end - timedelta(days=args.days - 1)
+    active = Student.objects.filter(is_active=True)
+    print(f'{active.count():,} students, {Attendance.objects.count():,} attendance rows, {start} to {end}\n')
+
+    def per_student_loop():
+        return {
+            student.pk: Attendance.objects.filter(
+                student=student, date__range=[start, end], status='present'
+            ).count()
+            for student in active
+        }
+
+    def set_based():
+        return build_attendance_report(start, end)
+
+    def matrix_report():
+        return AttendanceMatrix.load(start, end).student_counts()
+
+    def per_day_loop():
+        return [
+            Attendance.objects.filter(date=start + timedelta(days=i), status='present').count()
+            for i in range(args.days)
+        ]
+
+    results = {}
+    results['report: per-student loop'], loop_counts = best_of(1, per_student_loop)
+    results['report: set-based ORM'], (report, _) = best_of(args.repeat, set_based)
+    results['report: matrix (load + reduce)'], (present, late, absent) = best_of(args.repeat, matrix_report)
+
+    matrix = AttendanceMatrix.load(start, end)
+    results['matrix load only'], _ = best_of(args.repeat, lambda: AttendanceMatrix.load(start, end))
+    results['per-day totals: per-day loop'], day_counts = best_of(1, per_day_loop)
+    results['per-day totals: matrix'], totals = best_of(args.repeat, matrix.daily_totals)
+    results['weekday pattern: matrix'], _ = best_of(args.repeat, matrix.weekday_rates)
+    results['distribution: matrix'], _ = best_of(args.repeat, matrix.percentage_distribution)
+    results['absence detection: matrix'], _ = best_of(args.repeat, lambda: AbsenceReport(matrix).rows())
+
+    # The engines must agree before their timings mean anything
+    assert [row['present_days'] for row in report] == present.tolist()
+    assert [row['late_days'] for row in report] == late.tolist()
+    assert [row['absent_days'] for row in report] == absent.tolist()
+    assert [loop_counts[student.pk] for student in matrix.students] == present.tolist()
+    assert day_counts == totals['present'].tolist()
+
+    for label, seconds in results.items():
+        print(f'{label:<34} {seconds * 1000:>10.1f} ms')
+    print(f"\nmatrix: {matrix.codes.shape[0]} x {matrix.codes.shape[1]} int8 = {matrix.codes.nbytes / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
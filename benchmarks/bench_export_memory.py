@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Measure the peak resident memory of streaming the attendance export.
+Peak RSS should stay flat as the row count grows.
+
+Each size is exported in a fresh subprocess and measured with
+getrusage(RUSAGE_SELF).ru_maxrss, so the figure includes the SQLite driver,
+the cursor's row buffers and the C allocator, and one size's high-water
+mark never carries over into the next. Linux starts a child's ru_maxrss at
+its parent's RSS, so the parent only spawns processes: the rows are added
+by a separate subprocess too. "over baseline" is the growth during the
+export itself, after Django has been loaded.
+
+    python benchmarks/bench_export_memory.py --sizes 10000 100000 1000000
+    python benchmarks/bench_export_memory.py --sizes 10000000 --format ndjson
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django, create_teacher, create_students
+
+STUDENTS = 1000
+
+
+def grow_attendance(target, roster, teacher, batch_size=5000):
+    """Top the Attendance table up to `target` rows, one school day per roster pass."""
+    from attendance.models import Attendance
+
+    existing = Attendance.objects.count()
+    day = existing // len(roster)
+    start = date(2000, 1, 1)
+    batch = []
+    while existing < target:
+        for student in roster[: target - existing]:
+            batch.append(Attendance(student=student, date=start + timedelta(days=day), status='present', marked_by=teacher))
+            if len(batch) == batch_size:
+                Attendance.objects.bulk_create(batch)
+                batch = []
+        existing += min(len(roster), target - existing)
+        day += 1
+    if batch:
+        Attendance.objects.bulk_create(batch)
+
+
+def max_rss_kib():
+    """This process's peak resident set size; ru_maxrss is in bytes on macOS, KiB elsewhere."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def grow_once(database, target):
+    """Child process: create the schema and roster if needed, then top the table up to `target` rows."""
+    setup_benchmark_django({'ENGINE': 'django.db.backends.sqlite3', 'NAME': database})
+
+    from attendance.models import Student, Teacher
+
+    teacher = Teacher.objects.first() or create_teacher()
+    roster = list(Student.objects.order_by('student_id')) or create_students(STUDENTS)
+    grow_attendance(target, roster, teacher)
+
+
+def export_once(database, export_format):
+    """Child process: stream the whole export and print bytes, seconds, baseline and peak RSS."""
+    setup_benchmark_django({'ENGINE': 'django.db.backends.sqlite3', 'NAME': database}, create_schema=False)
+
+    from attendance.exports import EXPORT_FORMATS, filter_export_queryset
+
+    generate = EXPORT_FORMATS[export_format][0]
+    baseline = max_rss_kib()
+    started = time.perf_counter()
+    written = sum(len(chunk) for chunk in generate(filter_export_queryset()))
+    elapsed = time.perf_counter() - started
+    print(written, elapsed, baseline, max_rss_kib())
+
+
+def run_child(*args):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), *args], check=True, capture_output=True, text=True,
+    )
+    return result.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    parser.add_argument('--grow-to', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--export-only', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.grow_to is not None:
+        grow_once(args.database, args.grow_to)
+        return
+    if args.export_only:
+        export_once(args.database, args.format)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench-export-')
+    database = os.path.join(workdir, 'export.sqlite3')
+    try:
+        print(f"{'rows':>10} {'bytes out':>14} {'peak RSS KiB':>13} {'over baseline':>14} {'seconds':>9}")
+        for size in sorted(args.sizes):
+            run_child('--database', database, '--grow-to', str(size))
+            output = run_child('--database', database, '--format', args.format, '--export-only')
+            written, elapsed, baseline, peak = output.split()[-4:]
+            print(
+                f"{size:>10} {int(written):>14} {int(peak):>13} "
+                f"{int(peak) - int(baseline):>14} {float(elapsed):>9.2f}"
+            )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
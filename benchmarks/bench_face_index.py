@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Time face matching against the memory-mapped FaceIndex versus comparing a
+probe with each student's embedding in turn.
+
+    python benchmarks/bench_face_index.py --students 50000 --probes 8
+
+Embeddings are random unit vectors written as an index build in a temporary
+directory, so no photos or face_recognition install are needed. Timed:
+  * per-student loop: one distance per stored embedding, in Python
+  * vectorized difference: norm(embeddings - probe) per probe, as
+    face_recognition.face_distance does
+  * FaceIndex.match: every probe against every student in one matrix product
+  * opening the index: memory-mapped versus read into memory
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django
+
+
+def best_of(repeat, function):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--students', type=int, default=50000)
+    parser.add_argument('--probes', type=int, default=8, help='Faces in one check-in picture')
+    parser.add_argument('--dimensions', type=int, default=128)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_benchmark_django()
+    from attendance.faces import FaceIndex
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.students, args.dimensions)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    students = np.arange(1, args.students + 1, dtype=np.int64)
+    # Probes are noisy copies of known students, so every one should match
+    known = rng.choice(args.students, args.probes, replace=False)
+    probes = embeddings[known] + rng.normal(0, 0.01, (args.probes, args.dimensions)).astype(np.float32)
+    tolerance = 0.6
+
+    with tempfile.TemporaryDirectory() as root:
+        os.makedirs(os.path.join(root, 'bench'))
+        np.save(os.path.join(root, 'bench', 'students.npy'), students)
+        np.save(os.path.join(root, 'bench', 'embeddings.npy'), embeddings)
+
+        results = {}
+        results['open index: memory-mapped'], index = best_of(args.repeat, lambda: FaceIndex.open(root, 'bench'))
+        results['open index: read into memory'], _ = best_of(
+            args.repeat, lambda: np.load(os.path.join(root, 'bench', 'embeddings.npy')),
+        )
+
+        def per_student_loop():
+            matches = []
+            for probe in probes:
+                best, best_distance = None, None
+                for pk, embedding in zip(students, embeddings):
+                    distance = float(np.linalg.norm(embedding - probe))
+                    if best_distance is None or distance < best_distance:
+                        best, best_distance = int(pk), distance
+                matches.append(best if best_distance <= tolerance else None)
+            return matches
+
+        def vectorized_difference():
+            matches = []
+            for probe in probes:
+                distances = np.linalg.norm(embeddings - probe, axis=1)
+                nearest = int(distances.argmin())
+                matches.append(int(students[nearest]) if distances[nearest] <= tolerance else None)
+            return matches
+
+        def batched():
+            return [pk for pk, _ in index.match(probes, tolerance)]
+
+        loop_repeat = 1 if args.students * args.probes > 100_000 else args.repeat
+        results['per-student loop'], loop_matches = best_of(loop_repeat, per_student_loop)
+        results['vectorized difference, per probe'], vector_matches = best_of(args.repeat, vectorized_difference)
+        results['FaceIndex.match (batched)'], batched_matches = best_of(args.repeat, batched)
+
+    expected = [int(students[i]) for i in known]
+    assert loop_matches == vector_matches == batched_matches == expected
+
+    print(f'{args.students:,} students x {args.dimensions} dims, {args.probes} probe(s) per picture\n')
+    for label, seconds in results.items():
+        print(f'{label:<36} {seconds * 1000:>10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
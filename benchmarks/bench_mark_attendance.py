@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark the mark_attendance POST write path.
+Compares the old per-student get + update_or_create loop with the bulk
+upsert in attendance.marking.save_register.
+
+    python benchmarks/bench_mark_attendance.py --sizes 100 1000 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django, create_teacher, create_students, timed
+
+
+def legacy_loop(submitted, attendance_date, teacher):
+    """The pre-bulk implementation: one get and one update_or_create per row."""
+    from django.utils import timezone
+    from attendance.models import Student, Attendance
+
+    for student_id, status in submitted.items():
+        student = Student.objects.get(student_id=student_id, is_active=True)
+        local_time = timezone.localtime(timezone.now()).time()
+        Attendance.objects.update_or_create(
+            student=student,
+            date=attendance_date,
+            defaults={
+                'status': status,
+                'marked_by': teacher,
+                'time_in': local_time if status == 'present' else None,
+            },
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    setup_benchmark_django()
+
+    from datetime import date, timedelta
+    from attendance.marking import save_register
+    from attendance.models import Attendance, Student
+
+    teacher = create_teacher()
+    statuses = ['present', 'absent', 'late']
+
+    print(f"{'students':>10} {'loop (s)':>10} {'bulk (s)':>10} {'speedup':>9}")
+    for size in args.sizes:
+        Attendance.objects.all().delete()
+        Student.objects.all().delete()
+        students = create_students(size)
+        submitted = {s.student_id: random.choice(statuses) for s in students}
+
+        results = {}
+        with timed(results, 'loop'):
+            legacy_loop(submitted, date.today(), teacher)
+        with timed(results, 'bulk'):
+            save_register(submitted, date.today() - timedelta(days=1), teacher)
+
+        speedup = results['loop'] / results['bulk'] if results['bulk'] else float('inf')
+        print(f"{size:>10} {results['loop']:>10.3f} {results['bulk']:>10.3f} {speedup:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measure the static assets each page loads, as served after collectstatic:
+bytes on the wire uncompressed, gzip and brotli, plus the Cache-Control
+header each one gets.
+
+    python benchmarks/bench_static_assets.py
+
+The "before" column is the same pages with the previous asset set, which
+loaded Bootstrap, Font Awesome and Chart.js on every page (from CDNs).
+Transfer sizes for it use the same files, compressed the same way.
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import create_students, create_teacher, setup_benchmark_django
+
+ASSET_PATTERN = re.compile(r'<(?:link[^>]+href|script[^>]+src)="(/static/[^"]+)"')
+CHART_JS = 'vendor/chart.js-4.4.0/chart.umd.min.js'
+PAGES = [('dashboard', '/dashboard/'), ('students', '/students/'), ('report', '/attendance/report/')]
+ENCODINGS = ['identity', 'gzip', 'br']
+
+
+def fetch(client, url, encoding):
+    response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+    assert response.status_code == 200, (url, response.status_code)
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    return len(body), response.get('Cache-Control', '')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    static_root = tempfile.mkdtemp(prefix='attendance-static-')
+    setup_benchmark_django()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.templatetags.static import static
+    from django.test import Client, override_settings
+
+    settings.STATIC_ROOT = static_root
+    call_command('collectstatic', interactive=False, verbosity=0)
+
+    teacher = create_teacher()
+    create_students(20)
+    client = Client()
+    client.force_login(teacher.user)
+
+    with override_settings(DEBUG=False, ALLOWED_HOSTS=['*'], WHITENOISE_AUTOREFRESH=False, WHITENOISE_USE_FINDERS=False):
+        # WhiteNoise indexes STATIC_ROOT when the middleware is built, so build it now
+        client.handler.load_middleware()
+        chart_url = static(CHART_JS)
+        sizes = {}
+        pages = {}
+        for name, url in PAGES:
+            assets = ASSET_PATTERN.findall(client.get(url).content.decode())
+            pages[name] = assets
+            for asset in set(assets) | {chart_url}:
+                if asset not in sizes:
+                    sizes[asset] = {encoding: fetch(client, asset, encoding) for encoding in ENCODINGS}
+
+    print(f"{'asset':<72}{'identity':>10}{'gzip':>10}{'brotli':>10}  cache-control")
+    for asset, by_encoding in sorted(sizes.items()):
+        print(
+            f'{asset:<72}' + ''.join(f'{by_encoding[e][0]:>10,}' for e in ENCODINGS)
+            + f"  {by_encoding['identity'][1]}"
+        )
+
+    print(f"\n{'page':<12}{'assets':>8}{'identity':>12}{'brotli':>10}{'before: identity':>20}{'brotli':>10}")
+    for name, assets in pages.items():
+        before = [asset for asset in assets if asset != chart_url] + [chart_url]
+        total = lambda urls, encoding: sum(sizes[url][encoding][0] for url in urls)
+        print(
+            f'{name:<12}{len(assets):>8}{total(assets, "identity"):>12,}{total(assets, "br"):>10,}'
+            f'{total(before, "identity"):>20,}{total(before, "br"):>10,}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Time every view in attendance/urls.py and the admin changelists at several
+data scales, and write a JSON report that later runs can be compared with.
+
+    python benchmarks/bench_views.py --scales 500x0.5 2000x1 --output bench.json
+    python benchmarks/bench_views.py --scales 500x0.5 2000x1 --baseline bench.json
+
+A scale is STUDENTSxYEARS; data comes from `manage.py generate_synthetic_data`.
+With --baseline, any endpoint whose median time grew by more than
+--threshold (default 25%) is reported and the script exits non-zero.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django
+
+
+def endpoint_requests():
+    """(label, path) for every named route in attendance/urls.py plus the admin changelists."""
+    from django.contrib import admin
+    from django.urls import reverse
+    from attendance import urls
+    from attendance.models import Student, Holiday
+
+    student = Student.objects.order_by('pk').first()
+    holiday = Holiday.objects.order_by('pk').first()
+    # Synthetic students have no photos; a digest no student has still times the lookup and 404
+    photo_hash = Student.objects.exclude(photo_hash='').values_list('photo_hash', flat=True).first() or '0' * 64
+    sample_ids = ','.join(Student.objects.order_by('pk').values_list('student_id', flat=True)[:50])
+    today = date.today()
+    term = f'start_date={today - timedelta(days=120)}&end_date={today}'
+
+    arguments = {
+        'student_update': ({'pk': student.pk}, ''),
+        'student_delete': ({'pk': student.pk}, ''),
+        'delete_holiday': ({'pk': holiday.pk if holiday else 0}, ''),
+        'student_photo_thumbnail': ({'digest': photo_hash, 'size': 'small', 'ext': 'webp'}, ''),
+        'student_attendance_data': ({'student_id': student.student_id}, ''),
+        'attendance_report': ({}, term),
+        'export_attendance': ({}, f'format=csv&{term}'),
+        'batch_attendance_data': ({}, f'student_id={sample_ids}&{term}'),
+    }
+
+    requests, seen = [], set()
+    for pattern in urls.urlpatterns:
+        if pattern.name in seen:
+            continue
+        seen.add(pattern.name)
+        kwargs, query = arguments.get(pattern.name, ({}, ''))
+        path = reverse(pattern.name, kwargs=kwargs)
+        requests.append((pattern.name, f'{path}?{query}' if query else path))
+
+    for model in admin.site._registry:
+        if model._meta.app_label == 'attendance':
+            name = f'admin:attendance_{model._meta.model_name}_changelist'
+            requests.append((name, reverse(name)))
+    return requests
+
+
+def time_endpoint(client, user, path, repeat):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    queries = status = size = None
+    for attempt in range(repeat + 1):  # first request warms caches and is discarded
+        client.force_login(user)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(path)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            elapsed = time.perf_counter() - started
+        if attempt:
+            timings.append(elapsed * 1000)
+        queries, status, size = len(captured.captured_queries), response.status_code, len(body)
+
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': queries,
+        'status': status,
+        'bytes': size,
+    }
+
+
+def run_scale(students, years, repeat):
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import Client
+    from attendance.models import Teacher, Attendance
+
+    call_command('flush', interactive=False, verbosity=0)
+    started = time.perf_counter()
+    call_command('generate_synthetic_data', students=students, years=years, verbosity=0, stdout=open(os.devnull, 'w'))
+    generated = time.perf_counter() - started
+
+    user = User.objects.create_superuser('bench-admin', 'bench@example.com', 'bench')
+    Teacher.objects.create(user=user, name='Bench Admin', subject='-', phone='0')
+    settings.ALLOWED_HOSTS = ['*']
+
+    client = Client()
+    endpoints = {}
+    for label, path in endpoint_requests():
+        endpoints[label] = dict(path=path, **time_endpoint(client, user, path, repeat))
+        print(f"  {label:<45} {endpoints[label]['median_ms']:>9.1f} ms {endpoints[label]['queries']:>5} queries")
+
+    return {
+        'students': students,
+        'years': years,
+        'attendance_rows': Attendance.objects.count(),
+        'generate_seconds': round(generated, 2),
+        'endpoints': endpoints,
+    }
+
+
+def compare(report, baseline, threshold):
+    regressions = []
+    for scale, result in report['scales'].items():
+        previous = baseline.get('scales', {}).get(scale, {}).get('endpoints', {})
+        for label, timing in result['endpoints'].items():
+            before = previous.get(label)
+            if before and timing['median_ms'] > before['median_ms'] * (1 + threshold):
+                regressions.append(
+                    f"{scale} {label}: {before['median_ms']:.1f} ms -> {timing['median_ms']:.1f} ms"
+                )
+            if before and timing['queries'] > before['queries']:
+                regressions.append(f"{scale} {label}: {before['queries']} -> {timing['queries']} queries")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', nargs='+', default=['500x0.5', '2000x1'], help='STUDENTSxYEARS')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed requests per endpoint')
+    parser.add_argument('--output', help='Write the JSON report here')
+    parser.add_argument('--baseline', help='Earlier JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed slowdown before flagging')
+    args = parser.parse_args()
+
+    setup_benchmark_django()
+
+    import django
+    from django.db import connection
+
+    report = {
+        'generated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'scales': {},
+    }
+    for scale in args.scales:
+        students, years = scale.lower().split('x')
+        print(f'Scale {scale}:')
+        report['scales'][scale] = run_scale(int(students), float(years), args.repeat)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f'Report written to {args.output}')
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(report, json.load(baseline_file), args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Shared helpers for the benchmark scripts.
+Benchmarks run against a throwaway database (in-memory SQLite by default)
+so they never touch db.sqlite3.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_benchmark_django(database=None, create_schema=True):
+    """
+    Configure Django with a throwaway database and create the schema.
+    `database` overrides the default in-memory SQLite connection settings;
+    create_schema=False skips `migrate` for a database that is already set up.
+    """
+    if BASE_DIR not in sys.path:
+        sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_attendance.settings')
+
+    from django.conf import settings
+    settings.DATABASES['default'] = database or {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+    # Build the schema straight from the models, whatever migrations exist locally.
+    settings.MIGRATION_MODULES = {'attendance': None}
+
+    import django
+    django.setup()
+
+    if create_schema:
+        from django.core.management import call_command
+        call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def create_teacher(username='bench-teacher'):
+    from django.contrib.auth.models import User
+    from attendance.models import Teacher
+
+    user = User.objects.create_user(username, password='bench')
+    return Teacher.objects.create(user=user, name='Bench Teacher', subject='Benchmarks', phone='0')
+
+
+def create_students(count, prefix='BS'):
+    from attendance.models import Student
+
+    Student.objects.bulk_create(
+        [
+            Student(
+                student_id=f'{prefix}{i:07d}',
+                name=f'Student {i:07d}',
+                email=f'student{i}@example.com',
+                phone='0',
+                address='-',
+            )
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+    return list(Student.objects.filter(student_id__startswith=prefix).order_by('student_id'))
+
+
+@contextmanager
+def timed(results, label):
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
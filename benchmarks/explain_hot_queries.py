@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Check that the hot queries behind attendance/views.py use the purpose-built
+indexes declared on Student, Attendance and StudentMonthlyAttendance.
+
+    python benchmarks/explain_hot_queries.py              # in-memory SQLite
+    python benchmarks/explain_hot_queries.py --configured # DATABASES['default'], e.g. PostgreSQL
+
+Exits non-zero if any plan is missing its expected index. The same check
+runs in the test suite (attendance.tests.HotQueryPlanTests).
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django, create_teacher, create_students
+
+
+def hot_queries(today):
+    """
+    (label, queryset, acceptable index names) for each hot query. The querysets
+    come from the functions the views run, so a view that stops using its
+    index fails the check.
+    """
+    from attendance.models import StudentMonthlyAttendance
+    from attendance.reports import report_count_queries
+    from attendance.stats import present_by_day_query
+    from attendance.views import active_students_query, recent_attendance_query, register_prefill_query
+
+    week_start = today - timedelta(days=6)
+    term_start = today - timedelta(days=120)
+
+    queries = [
+        (
+            'dashboard: present by day (rollup fallback)',
+            present_by_day_query([week_start, today]),
+            'attendance_date_status_idx',
+        ),
+        (
+            'dashboard: recent attendance',
+            recent_attendance_query(today),
+            # Any index leading with date serves the equality lookup; neither covers the
+            # created_timestamp sort, so SQLite picks the narrower (date, student) one
+            ('attendance_date_status_idx', 'attendance_date_student_idx'),
+        ),
+        (
+            'mark_attendance: register prefill',
+            register_prefill_query(today),
+            # SQLite may skip-scan the (status, date, student) index since it covers the projection
+            ('attendance_date_status_idx', 'attendance_status_date_idx'),
+        ),
+        (
+            'student lists: active students by name',
+            active_students_query(),
+            'student_active_name_idx',
+        ),
+    ]
+    for queryset in report_count_queries(term_start, today):
+        if queryset.model is StudentMonthlyAttendance:
+            queries.append(('attendance_report: whole months', queryset, 'monthly_month_student_idx'))
+        else:
+            queries.append(('attendance_report: partial months', queryset, 'attendance_status_date_idx'))
+    return queries
+
+
+def check_plans(today):
+    """(label, acceptable index names, plan, uses one of them) for each hot query."""
+    results = []
+    for label, queryset, indexes in hot_queries(today):
+        if isinstance(indexes, str):
+            indexes = (indexes,)
+        plan = queryset.explain()
+        results.append((label, indexes, plan, any(index in plan for index in indexes)))
+    return results
+
+
+def seed(days=60, students=500):
+    """Enough rows that the planner prefers the indexes over a scan."""
+    import random
+    from django.db import connection
+    from attendance.models import Attendance
+    from attendance.rollups import rebuild_rollups
+
+    teacher = create_teacher('explain-teacher')
+    roster = create_students(students, prefix='EX')
+    today = date.today()
+    Attendance.objects.bulk_create(
+        [
+            Attendance(student=s, date=today - timedelta(days=d), status=random.choice(['present', 'absent', 'late']), marked_by=teacher)
+            for s in roster for d in range(days)
+        ],
+        batch_size=1000,
+    )
+    rebuild_rollups()
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--configured', action='store_true',
+                        help='Explain against the configured database instead of seeding in-memory SQLite')
+    args = parser.parse_args()
+
+    if args.configured:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_attendance.settings')
+        import django
+        django.setup()
+    else:
+        setup_benchmark_django()
+        seed()
+
+    failures = 0
+    for label, indexes, plan, ok in check_plans(date.today()):
+        failures += not ok
+        print(f"[{'ok' if ok else 'MISSING'}] {label} -> {' | '.join(indexes)}")
+        if not ok:
+            print('    ' + plan.replace('\n', '\n    '))
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Check-in burst load test for POST /api/attendance/.
+Fires single-student marks concurrently through Django's ASGI handler
+(asyncio tasks) and its WSGI handler (threads), and reports p50/p99
+latency for each. Requests go through the full middleware and view stack
+in-process, so the numbers compare the two paths rather than a web server.
+
+    python benchmarks/load_checkin.py --requests 2000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django, create_teacher, create_students
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)] if values else 0
+
+
+def report(label, latencies, errors, elapsed):
+    print(
+        f"{label:>5}: {len(latencies)} ok, {errors} failed, {len(latencies) / elapsed:8.1f} req/s, "
+        f"p50 {percentile(latencies, 0.5) * 1000:6.1f} ms, p99 {percentile(latencies, 0.99) * 1000:6.1f} ms"
+    )
+
+
+def run_wsgi(user, student_ids, concurrency):
+    from django.db import connection
+    from django.test import Client
+
+    local = threading.local()
+
+    def mark(student_id):
+        if not hasattr(local, 'client'):
+            local.client = Client()
+            local.client.force_login(user)
+        started = time.perf_counter()
+        response = local.client.post(
+            '/api/attendance/', json.dumps({'student_id': student_id, 'status': 'present'}),
+            content_type='application/json',
+        )
+        return response.status_code == 200, time.perf_counter() - started
+
+    def close_and_mark(student_id):
+        try:
+            return mark(student_id)
+        except Exception:
+            return False, 0
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(close_and_mark, student_ids))
+    return results, time.perf_counter() - started
+
+
+async def run_asgi(user, student_ids, concurrency):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    await client.aforce_login(user)
+    gate = asyncio.Semaphore(concurrency)
+
+    async def mark(student_id):
+        async with gate:
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    '/api/attendance/', json.dumps({'student_id': student_id, 'status': 'present'}),
+                    content_type='application/json',
+                )
+            except Exception:
+                return False, 0
+            return response.status_code == 200, time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(mark(student_id) for student_id in student_ids))
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_attendance.settings')
+    from student_attendance import settings as project_settings
+
+    path = os.path.join(tempfile.mkdtemp(prefix='attendance-checkin-'), 'checkin.sqlite3')
+    setup_benchmark_django({
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'OPTIONS': dict(project_settings.SQLITE_OPTIONS),
+    })
+
+    from django.conf import settings
+    from django.db import connection
+    from attendance.models import Attendance
+
+    settings.ALLOWED_HOSTS = ['*']
+    teacher = create_teacher()
+    student_ids = [s.student_id for s in create_students(args.requests)]
+    connection.close()
+
+    results, elapsed = run_wsgi(teacher.user, student_ids, args.concurrency)
+    report('wsgi', [t for ok, t in results if ok], sum(not ok for ok, _ in results), elapsed)
+
+    Attendance.objects.all().delete()
+    connection.close()
+
+    results, elapsed = asyncio.run(run_asgi(teacher.user, student_ids, args.concurrency))
+    report('asgi', [t for ok, t in results if ok], sum(not ok for ok, _ in results), elapsed)
+
+
+if __name__ == '__main__':
+    main()
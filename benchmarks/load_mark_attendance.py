@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Concurrency load test: many teachers submit the mark_attendance register at once.
+Reports throughput and lock-wait errors ("database is locked" and friends).
+
+    python benchmarks/load_mark_attendance.py --profile sqlite-plain
+    python benchmarks/load_mark_attendance.py --profile sqlite-tuned
+    python benchmarks/load_mark_attendance.py --profile configured   # DATABASES['default'], e.g. PostgreSQL
+
+The configured profile creates its tables in the configured database, so
+point it at a scratch database.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import setup_benchmark_django, create_students
+
+
+def database_for(profile, path):
+    if profile == 'configured':
+        return None
+    from student_attendance import settings as project_settings
+
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+        'OPTIONS': dict(project_settings.SQLITE_OPTIONS) if profile == 'sqlite-tuned' else {},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profile', choices=['sqlite-plain', 'sqlite-tuned', 'configured'], default='sqlite-tuned')
+    parser.add_argument('--teachers', type=int, default=100)
+    parser.add_argument('--students', type=int, default=40, help='Students on each teacher\'s register')
+    parser.add_argument('--rounds', type=int, default=3, help='Registers each teacher submits')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_attendance.settings')
+    if args.profile == 'configured':
+        import django
+        django.setup()
+        from django.core.management import call_command
+        call_command('migrate', run_syncdb=True, verbosity=0)
+    else:
+        workdir = tempfile.mkdtemp(prefix='attendance-load-')
+        setup_benchmark_django(database_for(args.profile, os.path.join(workdir, 'load.sqlite3')))
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connection, OperationalError
+    from django.test import Client
+    from attendance.models import Teacher
+
+    settings.ALLOWED_HOSTS = ['*']
+
+    teachers = []
+    for i in range(args.teachers):
+        user = User.objects.create_user(f'load-teacher-{i}', password='load')
+        Teacher.objects.create(user=user, name=f'Load Teacher {i}', subject='-', phone='0')
+        teachers.append(user)
+
+    registers = []
+    for i in range(args.teachers):
+        roster = create_students(args.students, prefix=f'L{i:03d}-')
+        registers.append({f'attendance-{s.student_id}': 'present' for s in roster})
+    connection.close()
+
+    latencies = []
+    errors = {'lock': 0, 'other': 0}
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(args.teachers)
+
+    def teacher_session(user, register):
+        client = Client()
+        client.force_login(user)
+        start_barrier.wait()
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            try:
+                response = client.post('/attendance/mark/', register)
+                failed = response.status_code >= 400
+            except OperationalError as exc:
+                failed = True
+                with lock:
+                    errors['lock' if 'lock' in str(exc) else 'other'] += 1
+            except Exception:
+                failed = True
+                with lock:
+                    errors['other'] += 1
+            else:
+                if failed:
+                    with lock:
+                        errors['other'] += 1
+            with lock:
+                if not failed:
+                    latencies.append(time.perf_counter() - started)
+        connection.close()
+
+    threads = [threading.Thread(target=teacher_session, args=pair) for pair in zip(teachers, registers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    attempted = args.teachers * args.rounds
+    p50 = latencies[len(latencies) // 2] if latencies else 0
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    print(f'profile:          {args.profile} ({connection.vendor})')
+    print(f'submissions:      {len(latencies)}/{attempted} ok in {elapsed:.2f}s')
+    print(f'throughput:       {len(latencies) / elapsed:.1f} registers/s')
+    print(f'latency p50/p99:  {p50 * 1000:.0f} ms / {p99 * 1000:.0f} ms')
+    print(f'lock-wait errors: {errors["lock"]}, other errors: {errors["other"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -4,11 +4,18 @@ Django Student Attendance Management System Setup Script
 This script automatically sets up the project with sample data
 """
 
+import argparse
 import os
 import sys
+from itertools import islice
+
 import django
 from django.core.management import execute_from_command_line
 
+# Rows per bulk_create call and per transaction when seeding.
+SEED_BATCH_SIZE = 20000
+
+
 def setup_django():
     """Setup Django environment"""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'student_attendance.settings')
@@ -41,7 +48,23 @@ def create_teacher():
     else:
         print("• Teacher user 'teacher' already exists")
 
-def create_sample_students():
+def seed_in_batches(model, objects, batch_size=SEED_BATCH_SIZE):
+    """
+    Insert objects with bulk_create(ignore_conflicts=True), one transaction per
+    batch, so re-running setup skips rows that already exist instead of checking
+    each one. Returns the number of objects attempted.
+    """
+    from django.db import transaction
+
+    attempted = 0
+    objects = iter(objects)
+    while batch := list(islice(objects, batch_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, batch_size=batch_size, ignore_conflicts=True)
+        attempted += len(batch)
+    return attempted
+
+def create_sample_students(count=5):
     """Create sample students"""
     from attendance.models import Student
 
@@ -83,13 +106,22 @@ def create_sample_students():
         }
     ]
 
-    created = 0
-    for student_data in students_data:
-        if not Student.objects.filter(student_id=student_data['student_id']).exists():
-            Student.objects.create(**student_data)
-            created += 1
+    # Beyond the five named students, generate numbered ones up to the requested count
+    students_data += [
+        {
+            'student_id': f'ST{i:03d}',
+            'name': f'Student {i:03d}',
+            'email': f'student{i}@student.edu',
+            'phone': f'+1{i:09d}',
+            'address': 'Campus Residence, City, State 12345'
+        }
+        for i in range(len(students_data) + 1, count + 1)
+    ]
 
-    print(f"✓ {created} new sample student(s) created (total attempted: {len(students_data)})")
+    before = Student.objects.count()
+    created = seed_in_batches(Student, (Student(**data) for data in students_data))
+
+    print(f"✓ {Student.objects.count() - before} new sample student(s) created (total attempted: {created})")
 
 def create_sample_holidays():
     """Create sample holidays"""
@@ -125,41 +157,56 @@ def create_sample_holidays():
 
     print(f"✓ {created} new sample holiday(s) created (total attempted: {len(holidays_data)})")
 
-def create_sample_attendance():
+def create_sample_attendance(days=7):
     """Create sample attendance records"""
+    from attendance.bulk import insert_attendance_rows
     from attendance.models import Attendance, Student, Teacher
     from datetime import date, time, timedelta
     import random
 
     teacher = Teacher.objects.first()
-    students = Student.objects.all()
+    student_pks = list(Student.objects.values_list('pk', flat=True))
 
-    if not teacher or not students.exists():
+    if not teacher or not student_pks:
         print("✗ No teacher or students found, skipping attendance creation")
         return
 
-    created = 0
-    # Create attendance for last 7 days
-    for i in range(7):
-        attendance_date = date.today() - timedelta(days=i)
-
-        for student in students:
-            # Random attendance (80% present)
-            if random.random() < 0.8:  # 80% attendance rate
-                if not Attendance.objects.filter(student=student, date=attendance_date).exists():
-                    Attendance.objects.create(
-                        student=student,
-                        date=attendance_date,
-                        time_in=time(9, random.randint(0, 30)),  # Between 9:00-9:30 AM
-                        status='present',
-                        marked_by=teacher
-                    )
-                    created += 1
-
-    print(f"✓ {created} sample attendance record(s) created")
+    def records():
+        # Attendance for the last `days` days
+        for i in range(days):
+            attendance_date = date.today() - timedelta(days=i)
+
+            for student_pk in student_pks:
+                # Random attendance (80% present)
+                if random.random() < 0.8:  # 80% attendance rate
+                    # Between 9:00-9:30 AM
+                    yield student_pk, attendance_date, 'present', teacher.pk, time(9, random.randint(0, 30))
+
+    # Attendance is the bulk of the data, so it skips model instances and goes
+    # through the executemany fast path; it ignores existing rows the same way.
+    before = Attendance.objects.count()
+    insert_attendance_rows(records(), batch_size=SEED_BATCH_SIZE)
+
+    print(f"✓ {Attendance.objects.count() - before} sample attendance record(s) created")
+
+def rebuild_derived_data():
+    """Bring summaries and counters up to date; bulk inserts bypass the model signals"""
+    from attendance.counters import recompute_counters
+    from attendance.rollups import rebuild_rollups
+
+    rebuild_rollups()
+    recompute_counters()
+    print("✓ Attendance summaries and student counters rebuilt")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Set up the project with sample data")
+    parser.add_argument('--students', type=int, default=5, help="Number of sample students (default: 5)")
+    parser.add_argument('--days', type=int, default=7, help="Days of sample attendance (default: 7)")
+    return parser.parse_args()
 
 def main():
     """Main setup function"""
+    args = parse_args()
     print("🚀 Setting up Django Student Attendance Management System...")
 
     # Setup Django
@@ -174,9 +221,10 @@ def main():
     print("\n👥 Creating sample data...")
     create_superuser()
     create_teacher()
-    create_sample_students()
+    create_sample_students(args.students)
     create_sample_holidays()
-    create_sample_attendance()
+    create_sample_attendance(args.days)
+    rebuild_derived_data()
 
     print("\n✅ Setup completed successfully!")
     print("\n📋 Quick Start Guide:")
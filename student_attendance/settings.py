@@ -16,6 +16,8 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    # Serve static files through WhiteNoise under runserver too, as in production
+    'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'attendance',
     'crispy_forms',
@@ -24,6 +26,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -32,6 +35,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Opt-in per-view query/latency instrumentation (Server-Timing headers, /metrics/)
+ATTENDANCE_INSTRUMENTATION = config('ATTENDANCE_INSTRUMENTATION', default=False, cast=bool)
+ATTENDANCE_QUERY_BUDGET = config('ATTENDANCE_QUERY_BUDGET', default=50, cast=int)
+ATTENDANCE_LATENCY_BUDGET_MS = config('ATTENDANCE_LATENCY_BUDGET_MS', default=500, cast=int)
+ATTENDANCE_METRICS_ALLOWED_IPS = config('ATTENDANCE_METRICS_ALLOWED_IPS', default='127.0.0.1', cast=lambda v: [ip.strip() for ip in v.split(',') if ip.strip()])
+
+if ATTENDANCE_INSTRUMENTATION:
+    MIDDLEWARE.insert(0, 'attendance.middleware.QueryInstrumentationMiddleware')
+
 ROOT_URLCONF = 'student_attendance.urls'
 
 TEMPLATES = [
@@ -51,13 +63,50 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'student_attendance.wsgi.application'
+ASGI_APPLICATION = 'student_attendance.asgi.application'
+
+# Database profile: DB_ENGINE=sqlite (default, small deployments) or postgresql (production)
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+# SQLite tuned for concurrent teachers: WAL lets readers run alongside the writer,
+# IMMEDIATE transactions take the write lock up front instead of failing on upgrade,
+# and timeout (seconds) is the busy_timeout a writer waits for the lock.
+SQLITE_OPTIONS = {
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': config('DB_BUSY_TIMEOUT', default=20, cast=int),
+}
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='student_attendance'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'OPTIONS': {},
+        }
+    }
+    if config('DB_POOL', default=False, cast=bool):
+        # psycopg 3 connection pool; Django requires CONN_MAX_AGE=0 when pooling
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=20, cast=int),
+        }
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = config('DB_CONN_MAX_AGE', default=60, cast=int)
+        DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': SQLITE_OPTIONS if config('DB_SQLITE_TUNED', default=True, cast=bool) else {},
+        }
     }
-}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -85,20 +134,81 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Static files (including the vendored Bootstrap, Font Awesome and Chart.js under static/vendor/)
+# are collected with content-hashed names plus .gz/.br variants; WhiteNoise serves the hashed
+# names with far-future immutable caching. Run `manage.py collectstatic` before serving with DEBUG off.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resized student photos, cached on disk by content hash and rendered off the request path
+THUMBNAIL_ROOT = config('THUMBNAIL_ROOT', default=str(MEDIA_ROOT / 'thumbnails'))
+THUMBNAIL_WORKER = config('THUMBNAIL_WORKER', default=True, cast=bool)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Each request loads the user with their Teacher profile in one query. TeacherBackend
+# is a ModelBackend, so it is the only backend: a second one would hash every failed
+# password twice.
+AUTHENTICATION_BACKENDS = ['attendance.backends.TeacherBackend']
+
+# CACHE_BACKEND/CACHE_LOCATION select the cache shared by dashboard statistics and
+# cached sessions; the default local-memory cache is private to each process.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Session storage: 'django.contrib.sessions.backends.db' (default) or '...cached_db', which
+# reads sessions from the cache and falls back to the database. With several worker
+# processes use cached_db only with a shared cache (Redis/Memcached), otherwise a logout
+# in one worker leaves the session cached in the others until it times out.
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.db')
+
 LOGIN_URL = 'teacher_login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'teacher_login'
 
 CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
+# Dashboard statistics are cached briefly and invalidated on attendance writes
+DASHBOARD_STATS_CACHE_TIMEOUT = config('DASHBOARD_STATS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Seconds a worker reuses its working-day calendar before reloading the holidays. Holiday
+# edits reach other workers at once only through a shared cache (CACHE_BACKEND)
+WORKING_DAY_CALENDAR_MAX_AGE = config('WORKING_DAY_CALENDAR_MAX_AGE', default=60, cast=int)
+
+# Report and dashboard statistics: 'orm' (grouped queries) or 'numpy' (in-memory students x days matrix)
+ATTENDANCE_ANALYTICS_ENGINE = config('ATTENDANCE_ANALYTICS_ENGINE', default='orm')
+
+# Absence detection: students attending less than this percentage of working days are
+# chronically absent, and this many consecutive absent working days raise a streak alert
+CHRONIC_ABSENCE_THRESHOLD = config('CHRONIC_ABSENCE_THRESHOLD', default=90, cast=float)
+ABSENCE_STREAK_ALERT_DAYS = config('ABSENCE_STREAK_ALERT_DAYS', default=3, cast=int)
+
+# Write-behind buffering for the check-in API (scanner bursts): marks are journaled,
+# coalesced per (student, date) and flushed in batches
+ATTENDANCE_WRITE_BEHIND = config('ATTENDANCE_WRITE_BEHIND', default=False, cast=bool)
+ATTENDANCE_WRITE_BEHIND_INTERVAL_MS = config('ATTENDANCE_WRITE_BEHIND_INTERVAL_MS', default=200, cast=int)
+ATTENDANCE_WRITE_BEHIND_MAX_RECORDS = config('ATTENDANCE_WRITE_BEHIND_MAX_RECORDS', default=500, cast=int)
+ATTENDANCE_WRITE_BEHIND_FSYNC = config('ATTENDANCE_WRITE_BEHIND_FSYNC', default=False, cast=bool)
+ATTENDANCE_WRITE_BEHIND_JOURNAL = config('ATTENDANCE_WRITE_BEHIND_JOURNAL', default=str(BASE_DIR / 'attendance_journal'))
+
 # Face Recognition Settings
 FACE_RECOGNITION_TOLERANCE = 0.6
 FACE_RECOGNITION_MODEL = 'hog'
+# Photo check-in: embeddings are computed when photos change and matched against an
+# on-disk index that every worker memory-maps. The default extractor needs the
+# face_recognition package; attendance.faces.PixelExtractor is a dependency-free stand-in.
+FACE_CHECKIN = config('FACE_CHECKIN', default=False, cast=bool)
+FACE_EMBEDDING_EXTRACTOR = config('FACE_EMBEDDING_EXTRACTOR', default='attendance.faces.FaceRecognitionExtractor')
+FACE_INDEX_ROOT = config('FACE_INDEX_ROOT', default=str(BASE_DIR / 'face_index'))
 
 # File Upload Settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
@@ -0,0 +1,17 @@
+"""
+Settings for the test suite: `manage.py test` selects this module, and other
+runners should set DJANGO_SETTINGS_MODULE=student_attendance.test_settings.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# The attendance app ships without migrations (setup.py generates them locally), so the
+# test database is built straight from the models, as the benchmarks do
+MIGRATION_MODULES = {'attendance': None}
+
+# Static URLs without a collectstatic manifest; WhiteNoise serves from the finders
+STORAGES = {
+    **STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+WHITENOISE_AUTOREFRESH = True